@@ -10,44 +10,33 @@ Prerequisites:
 """
 
 import os
-import time
+import asyncio
+import argparse
 from dotenv import load_dotenv
-from azure.ai.projects import AIProjectClient
-from azure.identity import DefaultAzureCredential
+from exercise_1_setup import get_project_client
 from rich.console import Console
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.table import Table
+from rich.markdown import Markdown
 
 console = Console()
 
-def create_basic_agent():
-    """Create a simple Azure AI agent"""
-    
-    console.print(Panel.fit(
-        "🤖 Creating Your First Azure AI Agent",
-        style="bold blue"
-    ))
-    
-    # Load environment variables
+# Test questions to ask the agent
+TEST_QUESTIONS = [
+    "Hello! I'm new to Azure AI agents. Can you explain what makes them so powerful for building AI applications?",
+    "What are the key components I need to understand when building my first agent?",
+    "Can you give me a practical example of when I would use an Azure AI agent versus a regular chatbot?"
+]
+
+# Load environment variables at import time (already done if exercise_1_setup loaded them)
+if not os.getenv("PROJECT_ENDPOINT"):
     load_dotenv()
-    
-    # Initialize client
-    console.print("\n🔧 [bold]Initializing Azure AI Project client...[/bold]")
-    try:
-        project_client = AIProjectClient(
-            endpoint=os.getenv('PROJECT_ENDPOINT'),
-            credential=DefaultAzureCredential()
-        )
-        console.print("✅ Client initialized successfully")
-    except Exception as e:
-        console.print(f"❌ Failed to initialize client: {e}")
-        return None, None
-    
-    # Create agent with detailed instructions
-    console.print("\n🎭 [bold]Creating agent...[/bold]")
-    
-    instructions = """
+
+AGENT_NAME = "Alex-Learning-Assistant"
+
+# Built once at import; also used to recognise an agent left by a previous run
+ALEX_INSTRUCTIONS = """
     You are Alex, a friendly and knowledgeable Azure AI assistant specializing in helping users learn Azure AI Foundry and agent development.
     
     Your personality:
@@ -74,26 +63,67 @@ def create_basic_agent():
     - Point out potential pitfalls
     - Suggest improvements and alternatives
     - Encourage experimentation and learning
-    """
+    """.strip()
+
+def kv_table(title=None, value_style="green"):
+    """Build a two-column Property/Value table"""
+    table = Table(title=title)
+    table.add_column("Property", style="cyan")
+    table.add_column("Value", style=value_style)
+    return table
+
+def find_existing_agent(project_client, model_deployment):
+    """Return an agent with the same name, model and instructions, if one exists"""
+    
+    for existing in project_client.agents.list_agents():
+        if (existing.name == AGENT_NAME
+                and existing.model == model_deployment
+                and existing.instructions == ALEX_INSTRUCTIONS):
+            return existing
+    return None
+
+def create_basic_agent():
+    """Create a simple Azure AI agent"""
+    
+    console.print(Panel.fit(
+        "🤖 Creating Your First Azure AI Agent",
+        style="bold blue"
+    ))
+    
+    model_deployment = os.getenv('MODEL_DEPLOYMENT_NAME')
+    
+    # Initialize client
+    console.print("\n🔧 [bold]Initializing Azure AI Project client...[/bold]")
+    try:
+        project_client = get_project_client()
+        console.print("✅ Client initialized successfully")
+    except Exception as e:
+        console.print(f"❌ Failed to initialize client: {e}")
+        return None, None
+    
+    # Create agent with detailed instructions
+    console.print("\n🎭 [bold]Creating agent...[/bold]")
     
     try:
-        agent = project_client.agents.create_agent(
-            model=os.getenv('MODEL_DEPLOYMENT_NAME'),
-            name="Alex-Learning-Assistant",
-            instructions=instructions.strip()
-        )
+        agent = find_existing_agent(project_client, model_deployment)
+        if agent:
+            console.print(f"♻️  Reusing existing agent [dim]{agent.id}[/dim]")
+        else:
+            agent = project_client.agents.create_agent(
+                model=model_deployment,
+                name=AGENT_NAME,
+                instructions=ALEX_INSTRUCTIONS
+            )
         
         # Display agent details
-        agent_table = Table()
-        agent_table.add_column("Property", style="cyan")
-        agent_table.add_column("Value", style="green")
+        agent_table = kv_table()
         
         agent_table.add_row("Name", agent.name)
         agent_table.add_row("ID", agent.id)
         agent_table.add_row("Model", agent.model)
         agent_table.add_row("Created", str(agent.created_at) if hasattr(agent, 'created_at') else 'N/A')
         
-        console.print(f"\n✅ [bold green]Agent created successfully![/bold green]")
+        console.print(f"\n✅ [bold green]Agent ready![/bold green]")
         console.print(agent_table)
         
         return agent, project_client
@@ -102,75 +132,123 @@ def create_basic_agent():
         console.print(f"❌ Failed to create agent: {e}")
         return None, None
 
-def test_agent_conversation(agent, project_client):
-    """Test the agent with a conversation"""
+def ask_question(agent, project_client, question):
+    """Ask a single question on its own thread and wait for the answer"""
+    
+    from azure.ai.agents.models import MessageDeltaChunk, ThreadRun
+    
+    thread = project_client.agents.threads.create()
+    
+    # Send user message
+    project_client.agents.messages.create(
+        thread_id=thread.id,
+        role="user",
+        content=question
+    )
+    
+    # Stream the run: the reply arrives as deltas over a single server-sent
+    # events connection, so there's no status polling or message fetch
+    run = None
+    chunks = []
+    with project_client.agents.runs.stream(
+        thread_id=thread.id,
+        agent_id=agent.id
+    ) as stream:
+        for _, event_data, _ in stream:
+            if isinstance(event_data, MessageDeltaChunk):
+                chunks.append(event_data.text)
+            elif isinstance(event_data, ThreadRun):
+                run = event_data
+    
+    response = "".join(chunks) if run and run.status == "completed" else None
+    
+    return thread, run, response
+
+def build_batched_prompt(questions):
+    """Combine the questions into one prompt that asks for a section per answer"""
+    
+    numbered = "\n".join(f"{i}. {question}" for i, question in enumerate(questions, 1))
+    return (
+        "Please answer each of the following questions in order. Start every answer "
+        "with a markdown heading of the form '## Question N'.\n\n" + numbered
+    )
+
+def show_run_failure(run):
+    """Print why a run did not complete"""
+    
+    console.print(f"❌ Run failed with status: {run.status if run else 'unknown'}")
+    if hasattr(run, 'last_error') and run.last_error:
+        console.print(f"Error details: {run.last_error}")
+
+async def test_agent_conversation(agent, project_client, per_question=False):
+    """Test the agent with the sample questions
+    
+    By default all questions go out as one structured prompt, so the agent
+    instructions are processed by a single run. With per_question=True each
+    question gets its own thread and the runs are in flight concurrently.
+    """
     
     console.print(f"\n💬 [bold]Testing conversation with {agent.name}...[/bold]")
     
     try:
-        # Create a conversation thread
-        thread = project_client.agents.threads.create()
-        console.print(f"📞 Created conversation thread: [dim]{thread.id}[/dim]")
-        
-        # Test questions to ask the agent
-        test_questions = [
-            "Hello! I'm new to Azure AI agents. Can you explain what makes them so powerful for building AI applications?",
-            "What are the key components I need to understand when building my first agent?",
-            "Can you give me a practical example of when I would use an Azure AI agent versus a regular chatbot?"
-        ]
+        # One live display for the whole test; each run gets its own task
+        # that is removed as soon as that run finishes
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=console
+        ) as progress:
+            async def answer(description, prompt):
+                task = progress.add_task(description, total=None)
+                try:
+                    return await asyncio.to_thread(ask_question, agent, project_client, prompt)
+                finally:
+                    progress.remove_task(task)
+            
+            if per_question:
+                results = await asyncio.gather(*(
+                    answer(f"🤖 Agent is answering question {i}/{len(TEST_QUESTIONS)}...", question)
+                    for i, question in enumerate(TEST_QUESTIONS, 1)
+                ))
+            else:
+                results = [await answer(
+                    f"🤖 Agent is answering {len(TEST_QUESTIONS)} questions...",
+                    build_batched_prompt(TEST_QUESTIONS)
+                )]
         
-        for i, question in enumerate(test_questions, 1):
-            console.print(f"\n🔄 [bold]Test Question {i}/{len(test_questions)}[/bold]")
+        if not per_question:
+            thread, run, response = results[0]
+            console.print(f"📞 Conversation thread: [dim]{thread.id}[/dim]")
+            console.print("\n".join(
+                f"👤 [bold blue]User ({i}/{len(TEST_QUESTIONS)}):[/bold blue] {question}"
+                for i, question in enumerate(TEST_QUESTIONS, 1)
+            ))
             
-            # Send user message
-            message = project_client.agents.messages.create(
-                thread_id=thread.id,
-                role="user",
-                content=question
-            )
+            # Display response
+            if run and run.status == "completed":
+                console.print("\n🤖 [bold green]Alex:[/bold green]")
+                console.print(Markdown(response))
+            else:
+                show_run_failure(run)
             
+            return [thread]
+        
+        for i, (question, (thread, run, response)) in enumerate(zip(TEST_QUESTIONS, results), 1):
+            console.print(f"\n🔄 [bold]Test Question {i}/{len(TEST_QUESTIONS)}[/bold]")
+            console.print(f"📞 Conversation thread: [dim]{thread.id}[/dim]")
             console.print(f"👤 [bold blue]User:[/bold blue] {question}")
             
-            # Start agent run
-            run = project_client.agents.runs.create(
-                thread_id=thread.id,
-                agent_id=agent.id
-            )
-            
-            # Wait for completion with progress indicator
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                console=console
-            ) as progress:
-                task = progress.add_task("🤖 Agent is thinking...", total=None)
-                
-                while run.status in ["queued", "in_progress"]:
-                    time.sleep(1)
-                    run = project_client.agents.runs.get(thread_id=thread.id, run_id=run.id)
-                    progress.update(task, description=f"🤖 Agent status: {run.status}")
-            
-            # Get and display response
-            if run.status == "completed":
-                messages = project_client.agents.messages.list(thread_id=thread.id)
-                
-                # Find the most recent assistant message
-                for msg in messages:
-                    if msg.role == "assistant" and msg.created_at > message.created_at:
-                        response = msg.content[0].text.value
-                        console.print(f"\n🤖 [bold green]Alex:[/bold green] {response}")
-                        break
+            # Display response
+            if run and run.status == "completed":
+                console.print(f"\n🤖 [bold green]Alex:[/bold green] {response}")
             else:
-                console.print(f"❌ Run failed with status: {run.status}")
-                if hasattr(run, 'last_error') and run.last_error:
-                    console.print(f"Error details: {run.last_error}")
-                break
+                show_run_failure(run)
             
-            # Pause between questions
-            if i < len(test_questions):
+            # Separator between questions
+            if i < len(TEST_QUESTIONS):
                 console.print("\n" + "─" * 50)
         
-        return thread
+        return [thread for thread, _, _ in results]
         
     except Exception as e:
         console.print(f"❌ Conversation test failed: {e}")
@@ -182,9 +260,7 @@ def demonstrate_agent_properties(agent):
     console.print(f"\n🔍 [bold]Exploring agent properties...[/bold]")
     
     # Show agent details
-    details_table = Table(title=f"Agent Details: {agent.name}")
-    details_table.add_column("Property", style="cyan")
-    details_table.add_column("Value", style="white")
+    details_table = kv_table(title=f"Agent Details: {agent.name}", value_style="white")
     
     # Get all available properties
     properties = [
@@ -214,8 +290,12 @@ def cleanup_agent(agent, project_client):
         console.print(f"⚠️ Failed to delete agent: {e}")
         console.print("You may need to manually delete it from the Azure AI Foundry portal")
 
-def main():
-    """Main exercise function"""
+def main(per_question=False, cleanup=False):
+    """Main exercise function
+    
+    The agent is kept by default so the next run finds and reuses it instead
+    of creating a new one; pass cleanup=True to delete it at the end.
+    """
     
     try:
         # Step 1: Create agent
@@ -227,7 +307,7 @@ def main():
         demonstrate_agent_properties(agent)
         
         # Step 3: Test conversation
-        thread = test_agent_conversation(agent, project_client)
+        asyncio.run(test_agent_conversation(agent, project_client, per_question))
         
         # Step 4: Show success message
         console.print(Panel.fit(
@@ -235,15 +315,18 @@ def main():
             "You've successfully:\n"
             "• Created your first Azure AI agent\n"
             "• Configured detailed instructions\n"
-            "• Tested multi-turn conversations\n"
+            "• Tested it with a set of sample questions\n"
             "• Learned about agent properties\n\n"
             "🚀 Next: Learn about threads and runs in exercise_3_conversation.py",
             style="bold green",
             title="✅ SUCCESS"
         ))
         
-        # Step 5: Cleanup
-        cleanup_agent(agent, project_client)
+        # Step 5: Cleanup (optional; a kept agent is reused by the next run)
+        if cleanup:
+            cleanup_agent(agent, project_client)
+        else:
+            console.print(f"\n♻️  Keeping agent [dim]{agent.id}[/dim] for the next run (use --cleanup to delete it)")
         
         # Show learning tips
         console.print(Panel(
@@ -252,14 +335,14 @@ def main():
             "2. [cyan]Conversation Flow[/cyan]: Thread → Message → Run → Response\n"
             "3. [cyan]Run States[/cyan]: Monitor 'queued', 'in_progress', 'completed' states\n"
             "4. [cyan]Error Handling[/cyan]: Always check run status before reading responses\n"
-            "5. [cyan]Resource Management[/cyan]: Clean up agents to avoid hitting limits\n\n"
+            "5. [cyan]Resource Management[/cyan]: Reuse agents instead of creating one per run to avoid hitting limits\n\n"
             "🎯 [bold]Try This:[/bold] Modify the agent instructions and see how it changes responses!",
             title="📚 Learning Summary"
         ))
         
     except KeyboardInterrupt:
         console.print("\n👋 Exercise interrupted by user")
-        if 'agent' in locals() and agent:
+        if cleanup and 'agent' in locals() and agent:
             cleanup_agent(agent, project_client)
     except Exception as e:
         console.print(f"\n💥 [bold red]Unexpected error:[/bold red] {e}")
@@ -269,4 +352,16 @@ def main():
         console.print("3. Verify Azure authentication with 'az login'")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Create and test your first Azure AI agent")
+    parser.add_argument(
+        "--per-question",
+        action="store_true",
+        help="ask each test question in its own run instead of one combined prompt"
+    )
+    parser.add_argument(
+        "--cleanup",
+        action="store_true",
+        help="delete the agent at the end instead of keeping it for the next run"
+    )
+    args = parser.parse_args()
+    main(per_question=args.per_question, cleanup=args.cleanup)
@@ -10,23 +10,37 @@ This exercise demonstrates:
 
 import os
 import time
+import asyncio
+import argparse
 from dotenv import load_dotenv
-from azure.ai.projects import AIProjectClient
-from azure.identity import DefaultAzureCredential
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
-from rich.markdown import Markdown
 
 console = Console()
 load_dotenv()
 
+# Agent lookups by name, cached so repeated demos skip list_agents()
+AGENT_CACHE_TTL = 60  # seconds
+_AGENT_CACHE = {}  # agent name -> (monotonic timestamp, agent)
+
+# Upper bound on reply length; a run that hits it ends "incomplete" with the text so far
+MAX_COMPLETION_TOKENS = 500
+
+def print_delta(text):
+    """Print a streamed chunk of a reply without a newline or markup parsing"""
+    console.print(text, end="", markup=False, highlight=False)
+
 class ConversationDemo:
     def __init__(self):
         """Initialize the conversation demo with Azure AI client"""
+        # Azure SDK imports are deferred until a client is actually needed
+        from azure.ai.projects import AIProjectClient
+        from exercise_1_setup import get_credential
+        
         self.project_client = AIProjectClient(
             endpoint=os.environ["PROJECT_ENDPOINT"],
-            credential=DefaultAzureCredential()
+            credential=get_credential()
         )
         self.agent = None
         self.thread = None
@@ -36,12 +50,19 @@ class ConversationDemo:
         try:
             console.print(f"🔍 Checking for existing agent '{agent_name}'...")
             
+            cached = _AGENT_CACHE.get(agent_name)
+            if cached and time.monotonic() - cached[0] < AGENT_CACHE_TTL:
+                agent = cached[1]
+                console.print(f"✅ Found cached agent: {agent.name} (ID: {agent.id})")
+                return agent
+            
             # Use the documented API: list_agents(...) on the Agents client.
             agents = self.project_client.agents.list_agents(limit=100)
             
             # Search for agent by name
             for agent in agents:
                 if agent.name == agent_name:
+                    _AGENT_CACHE[agent_name] = (time.monotonic(), agent)
                     console.print(f"✅ Found existing agent: {agent.name} (ID: {agent.id})")
                     return agent
             
@@ -91,6 +112,7 @@ class ConversationDemo:
                 name=agent_name,
                 instructions=instructions
             )
+            _AGENT_CACHE[agent_name] = (time.monotonic(), self.agent)
             console.print(f"✅ Created new agent: {self.agent.name} (ID: {self.agent.id})")
             return self.agent
         except Exception as e:
@@ -120,43 +142,12 @@ class ConversationDemo:
         
         for i, message in enumerate(conversation_flow, 1):
             console.print(f"\n[bold cyan]Turn {i}:[/bold cyan]")
-            console.print(f"👤 User: {message}")
-            
-            # Send message
-            self.project_client.agents.messages.create(
-                thread_id=self.thread.id,
-                role="user",
-                content=message
-            )
-            
-            # Create and process run
-            run = self.project_client.agents.runs.create_and_process(
-                thread_id=self.thread.id,
-                agent_id=self.agent.id
-            )
-            
-            # Get response
-            if run.status == "completed":
-                messages = self.project_client.agents.messages.list(
-                    thread_id=self.thread.id
-                )
-                
-                # Find the latest assistant message
-                for msg in messages:
-                    if msg.role == "assistant" and hasattr(msg, 'created_at'):
-                        # Get the most recent assistant message
-                        if not hasattr(self, '_last_message_time') or msg.created_at > self._last_message_time:
-                            self._last_message_time = msg.created_at
-                            response = self._extract_message_content(msg)
-                            console.print(f"🤖 Assistant: {response}")
-                            break
-            
-            time.sleep(1)  # Brief pause between turns
+            self._send_message_to_thread(self.thread.id, message)
         
         # Show thread summary
         self._show_thread_summary()
     
-    def demonstrate_multiple_threads_isolation(self):
+    async def demonstrate_multiple_threads_isolation(self):
         """Show how different threads don't share context"""
         console.print(Panel.fit(
             "🧵 [bold]Demo 2: Thread Isolation[/bold]\n"
@@ -165,39 +156,40 @@ class ConversationDemo:
         ))
         
         # Create two separate threads
-        thread1 = self.project_client.agents.threads.create()
-        thread2 = self.project_client.agents.threads.create()
-        
-        console.print(f"📝 Created Thread 1: {thread1.id}")
-        console.print(f"📝 Created Thread 2: {thread2.id}\n")
-        
-        # Thread 1: Introduce as Bob who likes cooking
-        console.print("[bold]Thread 1 Conversation:[/bold]")
-        self._send_message_to_thread(
-            thread1.id, 
-            "Hi, I'm Bob and I love cooking Italian food."
+        thread1, thread2 = await asyncio.gather(
+            asyncio.to_thread(self.project_client.agents.threads.create),
+            asyncio.to_thread(self.project_client.agents.threads.create)
         )
         
-        # Thread 2: Introduce as Carol who likes painting
-        console.print("\n[bold]Thread 2 Conversation:[/bold]")
-        self._send_message_to_thread(
-            thread2.id, 
-            "Hello, I'm Carol and I enjoy painting landscapes."
-        )
-        
-        # Thread 1: Ask what the agent remembers
-        console.print("\n[bold]Back to Thread 1:[/bold]")
-        self._send_message_to_thread(
-            thread1.id, 
-            "What do you remember about me?"
-        )
+        console.print(f"📝 Created Thread 1: {thread1.id}")
+        console.print(f"📝 Created Thread 2: {thread2.id}")
+        
+        # Bob (who likes cooking) talks on thread 1 and Carol (who likes
+        # painting) on thread 2, then both ask what the agent remembers.
+        # The threads are independent, so each round runs on both at once.
+        rounds = [
+            [
+                ("Thread 1 Conversation", thread1.id, "Hi, I'm Bob and I love cooking Italian food."),
+                ("Thread 2 Conversation", thread2.id, "Hello, I'm Carol and I enjoy painting landscapes.")
+            ],
+            [
+                ("Back to Thread 1", thread1.id, "What do you remember about me?"),
+                ("Back to Thread 2", thread2.id, "What do you remember about me?")
+            ]
+        ]
         
-        # Thread 2: Ask what the agent remembers
-        console.print("\n[bold]Back to Thread 2:[/bold]")
-        self._send_message_to_thread(
-            thread2.id, 
-            "What do you remember about me?"
-        )
+        for turns in rounds:
+            with console.status("🤖 Waiting for both threads..."):
+                responses = await asyncio.gather(*(
+                    asyncio.to_thread(self._ask, thread_id, content)
+                    for _, thread_id, content in turns
+                ))
+            
+            for (label, _, content), response in zip(turns, responses):
+                console.print(f"\n[bold]{label}:[/bold]")
+                console.print(f"👤 User: {content}")
+                if response is not None:
+                    console.print(f"🤖 Assistant: {response}")
         
         console.print("\n💡 [bold]Note:[/bold] Each thread maintains its own conversation history!")
     
@@ -233,27 +225,37 @@ class ConversationDemo:
         """Helper to send a message to a specific thread"""
         console.print(f"👤 User: {content}")
         
-        # Create message
-        self.project_client.agents.messages.create(
-            thread_id=thread_id,
-            role="user",
-            content=content
-        )
-        
-        # Process run
-        run = self.project_client.agents.runs.create_and_process(
+        # The reply is printed as it is generated
+        console.print("🤖 Assistant: ", end="")
+        response = self._ask(thread_id, content, on_text=print_delta)
+        console.print()
+        if response is None:
+            console.print("⚠️ The run did not complete")
+    
+    def _ask(self, thread_id, content, on_text=None):
+        """Send a message to a thread and return the assistant's reply (None if the run failed)"""
+        from azure.ai.agents.models import MessageDeltaChunk, ThreadMessageOptions, ThreadRun
+        
+        # The user message is added by the run itself, and the reply arrives
+        # as deltas over the same connection: one request per turn, with no
+        # separate message create, status polling or message fetch
+        run = None
+        chunks = []
+        with self.project_client.agents.runs.stream(
             thread_id=thread_id,
-            agent_id=self.agent.id
-        )
-        
-        # Get response
-        if run.status == "completed":
-            messages = self.project_client.agents.messages.list(thread_id=thread_id)
-            for msg in messages:
-                if msg.role == "assistant":
-                    response = self._extract_message_content(msg)
-                    console.print(f"🤖 Assistant: {response}")
-                    break
+            agent_id=self.agent.id,
+            additional_messages=[ThreadMessageOptions(role="user", content=content)],
+            max_completion_tokens=MAX_COMPLETION_TOKENS
+        ) as stream:
+            for _, event_data, _ in stream:
+                if isinstance(event_data, MessageDeltaChunk):
+                    chunks.append(event_data.text)
+                    if on_text:
+                        on_text(event_data.text)
+                elif isinstance(event_data, ThreadRun):
+                    run = event_data
+        
+        return "".join(chunks) if run and run.status in ("completed", "incomplete") else None
     
     def _extract_message_content(self, message):
         """Extract content from message object"""
@@ -269,7 +271,13 @@ class ConversationDemo:
         if not self.thread:
             return
         
-        messages = self.project_client.agents.messages.list(thread_id=self.thread.id)
+        from azure.ai.agents.models import ListSortOrder
+        
+        # Ask for chronological order rather than reversing the default (newest first)
+        messages = self.project_client.agents.messages.list(
+            thread_id=self.thread.id,
+            order=ListSortOrder.ASCENDING
+        )
         
         table = Table(title=f"Thread Summary (ID: {self.thread.id[:8]}...)")
         table.add_column("Turn", style="cyan")
@@ -277,7 +285,7 @@ class ConversationDemo:
         table.add_column("Message Preview", style="white")
         
         turn = 1
-        for msg in reversed(list(messages)):  # Show in chronological order
+        for msg in messages:
             content = self._extract_message_content(msg)
             preview = content[:50] + "..." if len(content) > 50 else content
             table.add_row(str(turn), msg.role.capitalize(), preview)
@@ -291,9 +299,14 @@ class ConversationDemo:
         console.print(f"\n📜 [bold]Full Thread History[/bold]")
         console.print(f"Thread ID: {thread_id}\n")
         
-        messages = self.project_client.agents.messages.list(thread_id=thread_id)
+        from azure.ai.agents.models import ListSortOrder
         
-        for msg in reversed(list(messages)):
+        messages = self.project_client.agents.messages.list(
+            thread_id=thread_id,
+            order=ListSortOrder.ASCENDING
+        )
+        
+        for msg in messages:
             role_emoji = "👤" if msg.role == "user" else "🤖"
             content = self._extract_message_content(msg)
             console.print(f"{role_emoji} [bold]{msg.role.capitalize()}:[/bold] {content}")
@@ -305,13 +318,14 @@ class ConversationDemo:
             console.print(f"\n🧹 Cleaning up agent: {self.agent.name} (ID: {self.agent.id})")
             try:
                 self.project_client.agents.delete(self.agent.id)
+                _AGENT_CACHE.pop(self.agent.name, None)
                 console.print(f"🗑️ Deleted agent: {self.agent.id}")
             except Exception as e:
                 console.print(f"⚠️ Error deleting agent: {e}")
                 console.print("You may need to manually delete it from the Azure AI Foundry portal")
 
 
-def main():
+def main(non_interactive=False):
     """Run the conversation history demonstrations"""
     console.print(Panel.fit(
         "🎓 [bold]Exercise 3: Threads and Conversation History[/bold]\n"
@@ -327,11 +341,13 @@ def main():
         
         # Demo 1: Single thread with conversation history
         demo.demonstrate_single_thread_conversation()
-        input("\n➡️  Press Enter to continue to Demo 2...")
+        if not non_interactive:
+            input("\n➡️  Press Enter to continue to Demo 2...")
         
         # Demo 2: Multiple threads showing isolation
-        demo.demonstrate_multiple_threads_isolation()
-        input("\n➡️  Press Enter to continue to Demo 3...")
+        asyncio.run(demo.demonstrate_multiple_threads_isolation())
+        if not non_interactive:
+            input("\n➡️  Press Enter to continue to Demo 3...")
         
         # Demo 3: Thread persistence
         demo.demonstrate_thread_persistence()
@@ -354,7 +370,10 @@ def main():
     finally:
         # Ask user if they want to keep the agent for inspection
         console.print("\n" + "=" * 50)
-        keep_agent = input("💭 Keep agent for inspection? (y/N): ").strip().lower()
+        if non_interactive:
+            keep_agent = "n"
+        else:
+            keep_agent = input("💭 Keep agent for inspection? (y/N): ").strip().lower()
         
         if keep_agent != 'y':
             demo.cleanup()
@@ -366,4 +385,11 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Explore threads and conversation history")
+    parser.add_argument(
+        "--non-interactive",
+        action="store_true",
+        help="run all demos without pausing and delete the agent at the end"
+    )
+    args = parser.parse_args()
+    main(non_interactive=args.non_interactive)
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""Azure clients shared by the tool exercises, created once per process"""
+
+from functools import lru_cache
+from azure.ai.projects import AIProjectClient
+from azure.identity import AzureCliCredential, DefaultAzureCredential
+from config import settings
+
+
+@lru_cache(maxsize=1)
+def get_credential():
+    """Return a process-wide Azure credential, created on first use"""
+    if settings.use_cli_credential:
+        return AzureCliCredential(process_timeout=10)
+    return DefaultAzureCredential(
+        exclude_interactive_browser_credential=True,
+        exclude_visual_studio_code_credential=True,
+        exclude_shared_token_cache_credential=True,
+        process_timeout=10
+    )
+
+
+@lru_cache(maxsize=None)
+def get_project_client(api_version=None):
+    """Return a process-wide AIProjectClient for PROJECT_ENDPOINT and the given API version"""
+    kwargs = {"api_version": api_version} if api_version else {}
+    return AIProjectClient(
+        endpoint=settings.project_endpoint,
+        credential=get_credential(),
+        **kwargs
+    )
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""Settings shared by the tool exercises, read from .env and the environment once per process"""
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+@dataclass(frozen=True)
+class Settings:
+    project_endpoint: Optional[str]
+    model_deployment_name: Optional[str]
+    sharepoint_connection_name: Optional[str]
+    project_name: Optional[str]
+    use_cli_credential: bool = False
+    response_cache: bool = False
+
+    def require(self, *names):
+        """Raise EnvironmentError if any of the named settings is unset"""
+        for name in names:
+            if not getattr(self, name):
+                raise EnvironmentError(f"Missing required environment variable: {name.upper()}")
+
+
+settings = Settings(
+    project_endpoint=os.getenv("PROJECT_ENDPOINT"),
+    model_deployment_name=os.getenv("MODEL_DEPLOYMENT_NAME"),
+    sharepoint_connection_name=os.getenv("SHAREPOINT_CONNECTION_NAME"),
+    project_name=os.getenv("PROJECT_NAME"),
+    # AZURE_USE_CLI_CRED=1 skips the credential chain and uses the Azure CLI login
+    use_cli_credential=os.getenv("AZURE_USE_CLI_CRED") == "1",
+    response_cache=os.getenv("AGENT_RESPONSE_CACHE") == "1"
+)
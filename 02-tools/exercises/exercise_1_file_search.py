@@ -1,21 +1,24 @@
 #!/usr/bin/env python3
 
-import os
+import time
+import hashlib
+import asyncio
 from pathlib import Path
-from dotenv import load_dotenv
-from azure.ai.projects import AIProjectClient
-from azure.identity import DefaultAzureCredential
-from azure.ai.agents.models import FileSearchTool, FilePurpose
+from clients import get_project_client
+from config import settings
+from azure.ai.agents.models import FileSearchTool, FilePurpose, ListSortOrder
+
+# Keep answers short and deterministic; a run that hits the cap ends "incomplete"
+MAX_COMPLETION_TOKENS = 500
+
+# Agent lookups by name, cached so repeated setups skip list_agents()
+AGENT_CACHE_TTL = 60  # seconds
+_AGENT_CACHE = {}  # agent name -> (monotonic timestamp, agent)
 
 
 class DocumentProcessor:
-    def __init__(self):
-        load_dotenv()
-        self.client = AIProjectClient(
-            endpoint=os.getenv('PROJECT_ENDPOINT'),
-            credential=DefaultAzureCredential(),
-            api_version="2025-05-15-preview"
-        )
+    def __init__(self, client=None):
+        self.client = client or get_project_client(api_version="2025-05-15-preview")
         self.vector_store = None
         self.agent = None
         self.uploaded_files = []  # Track uploaded files for cleanup
@@ -119,45 +122,62 @@ CONTACTS
 """
         }
         
+        written = 0
         for filename, content in documents.items():
             filepath = docs_dir / filename
+            # Leave files from a previous run alone when their content is unchanged
+            if filepath.exists() and filepath.read_text() == content.strip():
+                continue
             filepath.write_text(content.strip())
+            written += 1
         
-        print(f"Created {len(documents)} sample documents in {docs_dir}")
+        print(f"Created {len(documents)} sample documents in {docs_dir} ({written} written, {len(documents) - written} unchanged)")
         return list(docs_dir.glob("*.txt"))
 
+    async def _upload_files(self, file_paths, max_concurrency=8):
+        """Upload files concurrently, returning them in the order given"""
+        # Uploads are named after a hash of their content, so a file already on
+        # the service under the same name has the same bytes and can be reused
+        existing = await asyncio.to_thread(
+            lambda: {f.filename: f for f in self.client.agents.files.list(purpose=FilePurpose.AGENTS).data}
+        )
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def upload(file_path):
+            data = file_path.read_bytes()
+            filename = f"{hashlib.sha256(data).hexdigest()[:12]}-{file_path.name}"
+            if filename in existing:
+                return existing[filename]
+            async with semaphore:
+                return await asyncio.to_thread(
+                    self.client.agents.files.upload_and_poll,
+                    file=data,
+                    filename=filename,
+                    purpose=FilePurpose.AGENTS
+                )
+
+        return await asyncio.gather(*(upload(file_path) for file_path in file_paths))
+
     def upload_documents(self, file_paths):
         """Upload documents and create or reuse vector store"""
         print("Uploading documents...")
 
-        uploaded_files = []
-        for file_path in file_paths:
-            # Upload file 
-            file_obj = self.client.agents.files.upload_and_poll(
-                file_path=str(file_path),
-                purpose=FilePurpose.AGENTS
-            )
-            uploaded_files.append(file_obj)
+        # Each upload is an independent request/poll cycle, so they run side by side
+        uploaded_files = asyncio.run(self._upload_files(file_paths))
+        for file_path, file_obj in zip(file_paths, uploaded_files):
             self.uploaded_files.append(file_obj)  # Track for cleanup
             print(f"Uploaded: {file_path.name} -> {file_obj.id}")
 
-        uploaded_file_ids = set(f.id for f in uploaded_files)
+        # The store name is derived from the file set, so finding a store with
+        # the same files is a name match instead of listing every store's files
+        file_ids = sorted(f.id for f in uploaded_files)
+        store_name = "document-intelligence-" + hashlib.sha256(",".join(file_ids).encode()).hexdigest()[:16]
 
         # Check for existing vector store with the same files
         print("Checking for existing vector stores with the same files...")
         try:
             for vs in self.client.agents.vector_stores.list():
-                # Get file IDs for this vector store using the correct method
-                vs_file_ids = set()
-                try:
-                    # Use vector_store_files operations directly from agents client
-                    for f in self.client.agents.vector_store_files.list(vector_store_id=vs.id):
-                        vs_file_ids.add(f.id)
-                except Exception as e:
-                    print(f"Could not list files for vector store {vs.id}: {e}")
-                    continue
-
-                if vs_file_ids == uploaded_file_ids:
+                if vs.name == store_name:
                     print(f"Found existing vector store: {vs.id}")
                     self.vector_store = vs
                     return self.vector_store
@@ -166,8 +186,8 @@ CONTACTS
 
         # Create vector store
         self.vector_store = self.client.agents.vector_stores.create_and_poll(
-            file_ids=[f.id for f in uploaded_files],
-            name="document-intelligence-store"
+            file_ids=file_ids,
+            name=store_name
         )
 
         print(f"Created vector store: {self.vector_store.id}")
@@ -175,10 +195,16 @@ CONTACTS
 
     def get_or_create_agent(self, name, model, instructions, tools, tool_resources):
         """Get existing agent or create new one"""
+        cached = _AGENT_CACHE.get(name)
+        if cached and time.monotonic() - cached[0] < AGENT_CACHE_TTL:
+            print(f"Found cached agent: {cached[1].id}")
+            return cached[1]
+        
         try:
             agents = self.client.agents.list_agents()
             for agent in agents:
                 if agent.name == name:
+                    _AGENT_CACHE[name] = (time.monotonic(), agent)
                     print(f"Found existing agent: {agent.id}")
                     return agent
         except Exception as e:
@@ -192,6 +218,7 @@ CONTACTS
             tools=tools,
             tool_resources=tool_resources
         )
+        _AGENT_CACHE[name] = (time.monotonic(), agent)
         print(f"Created new agent: {agent.id}")
         return agent
     
@@ -203,7 +230,7 @@ CONTACTS
         
         self.agent = self.get_or_create_agent(
             name="document-search-agent",
-            model=os.getenv('MODEL_DEPLOYMENT_NAME'),
+            model=settings.model_deployment_name,
             instructions="""
 You are a document intelligence assistant. You help users find and analyze information from uploaded documents.
 
@@ -229,13 +256,17 @@ When answering questions:
         print(f"Using search agent: {self.agent.id}")
         return self.agent
 
-    def search_documents(self, query):
+    def search_documents(self, query, new_thread=False):
         """Search documents using the agent"""
-        # Reuse the persistent thread (create lazily if missing)
-        if self.thread is None:
-            self.thread = self.client.agents.threads.create()
-            print(f"Created thread for searches: {self.thread.id}")
-        thread = self.thread
+        if new_thread:
+            # A thread only accepts one active run, so concurrent searches each need their own
+            thread = self.client.agents.threads.create()
+        else:
+            # Reuse the persistent thread (create lazily if missing)
+            if self.thread is None:
+                self.thread = self.client.agents.threads.create()
+                print(f"Created thread for searches: {self.thread.id}")
+            thread = self.thread
 
         # Send query
         self.client.agents.messages.create(
@@ -247,20 +278,21 @@ When answering questions:
         # Process with agent
         run = self.client.agents.runs.create_and_process(
             thread_id=thread.id,
-            agent_id=self.agent.id
+            agent_id=self.agent.id,
+            max_completion_tokens=MAX_COMPLETION_TOKENS,
+            temperature=0
         )
         
         try:
-            if run.status == "completed":
-                messages = list(self.client.agents.messages.list(thread_id=thread.id))
-                # Prefer the latest assistant message; fall back to last message
-                assistant_msg = None
-                for m in reversed(messages):
-                    if getattr(m, "role", None) == "assistant":
-                        assistant_msg = m
-                        break
-                if assistant_msg is None and messages:
-                    assistant_msg = messages[-1]
+            if run.status in ("completed", "incomplete"):
+                # Only the newest message written by this run is needed, so ask
+                # the service for exactly that instead of the whole thread
+                assistant_msg = next(iter(self.client.agents.messages.list(
+                    thread_id=thread.id,
+                    run_id=run.id,
+                    order=ListSortOrder.DESCENDING,
+                    limit=1
+                )), None)
 
                 # Extract text safely from the content block(s)
                 response = ""
@@ -276,8 +308,8 @@ When answering questions:
                 
                 # Extract citations if present
                 citations = []
-                if hasattr(messages[0].content[0], 'annotations'):
-                    for annotation in messages[0].content[0].annotations:
+                if assistant_msg and assistant_msg.content and hasattr(assistant_msg.content[0], 'annotations'):
+                    for annotation in assistant_msg.content[0].annotations:
                         if hasattr(annotation, 'file_citation'):
                             citations.append(annotation.file_citation.file_id)
                 
@@ -305,6 +337,16 @@ When answering questions:
         #     except Exception as e:
         #         print(f"Error deleting thread {thread.id}: {e}")
 
+    async def run_batch(self, queries, max_concurrency=5):
+        """Search independent queries concurrently, each on its own thread; results keep query order"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def search(query):
+            async with semaphore:
+                return await asyncio.to_thread(self.search_documents, query, new_thread=True)
+
+        return await asyncio.gather(*(search(query) for query in queries))
+
 # def cleanup(self):
 #     """Clean up resources"""
 #     if self.agent:
@@ -347,11 +389,14 @@ def run_file_search_demo():
             "What is the monthly fee in the contract?"
         ]
         
-        for i, query in enumerate(test_queries, 1):
+        # The queries don't depend on each other, so they are searched concurrently
+        print(f"\nRunning {len(test_queries)} searches...")
+        results = asyncio.run(processor.run_batch(test_queries))
+        
+        for i, (query, result) in enumerate(zip(test_queries, results), 1):
             print(f"\n--- Search {i} ---")
             print(f"Query: {query}")
             
-            result = processor.search_documents(query)
             if result['status'] == 'success':
                 print(f"Response: {result['response'][:200]}...")
                 if result['citations']:
@@ -1,35 +1,55 @@
 #!/usr/bin/env python3
 
-import os
-from dotenv import load_dotenv
-from azure.ai.projects import AIProjectClient
-from azure.identity import DefaultAzureCredential
-from azure.ai.agents.models import CodeInterpreterTool
+import time
+import asyncio
+from clients import get_project_client
+from config import settings
+from response_cache import get_cached_response, cache_response
+from azure.ai.agents.models import CodeInterpreterTool, ListSortOrder
+
+# Write buffer for streamed downloads, so small chunks become few write() calls
+DOWNLOAD_BUFFER_SIZE = 1 << 20
+
+# Agents indexed by name, filled from a single list_agents() scan per process
+_agents_by_name = None
+
+def find_agent(client, name):
+    """Return the newest agent with the given name, or None"""
+    global _agents_by_name
+    if _agents_by_name is None:
+        index = {}
+        for agent in client.agents.list_agents():
+            index.setdefault(agent.name, agent)  # listed newest first
+        _agents_by_name = index
+    return _agents_by_name.get(name)
+
+def remember_agent(agent):
+    """Add a newly created agent to the name index"""
+    if _agents_by_name is not None:
+        _agents_by_name[agent.name] = agent
 
 
 class DataAnalyst:
-    def __init__(self):
-        load_dotenv()
-        self.client = AIProjectClient(
-            endpoint=os.getenv('PROJECT_ENDPOINT'),
-            credential=DefaultAzureCredential(),
-            api_version="2025-05-15-preview"
-        )
+    def __init__(self, client=None, poll_initial=0.1, poll_max=2.0):
+        self.client = client or get_project_client(api_version="2025-05-15-preview")
         self.agent = None
+        self.thread = None  # persistent thread to reuse across tasks
+        # Run status polling starts fast and backs off up to poll_max seconds
+        self.poll_initial = poll_initial
+        self.poll_max = poll_max
 
     def create_data_agent(self):
         """Get existing agent or create a new one with code interpreter capabilities."""
         agent_name = "data-analyst-agent"
-        model_name = os.getenv('MODEL_DEPLOYMENT_NAME')
+        model_name = settings.model_deployment_name
         code_tool = CodeInterpreterTool()
         # Try to find existing agent by name
         try:
-            agents = self.client.agents.list_agents()
-            for agent in agents:
-                if getattr(agent, "name", None) == agent_name:
-                    self.agent = agent
-                    print(f"Using existing data analyst agent: {self.agent.id}")
-                    return self.agent
+            agent = find_agent(self.client, agent_name)
+            if agent:
+                self.agent = agent
+                print(f"Using existing data analyst agent: {self.agent.id}")
+                return self.agent
         except Exception as e:
             print(f"Error listing agents: {e}")
         # Create new agent if not found
@@ -55,14 +75,26 @@ When given data tasks:
             tools=code_tool.definitions,
             tool_resources=code_tool.resources
         )
+        remember_agent(self.agent)
         print(f"Created data analyst agent: {self.agent.id}")
         return self.agent
 
-    def analyze_data(self, task_description):
+    def analyze_data(self, task_description, new_thread=False):
         """Send analysis task to agent and ensure agent is always associated with the run."""
         if not self.agent:
             raise RuntimeError("Agent is not initialized. Call create_data_agent() first.")
-        thread = self.client.agents.threads.create()
+        # Only analyses on a new thread are cached: a cached result on the shared
+        # thread would skip posting the task, leaving later tasks without it
+        if new_thread:
+            cached = get_cached_response(self.agent.name, task_description)
+            if cached is not None:
+                return cached
+            thread = self.client.agents.threads.create()
+        else:
+            # Reuse one thread across requests (create lazily if missing)
+            if self.thread is None:
+                self.thread = self.client.agents.threads.create()
+            thread = self.thread
         self.client.agents.messages.create(
             thread_id=thread.id,
             role="user",
@@ -72,17 +104,25 @@ When given data tasks:
             thread_id=thread.id,
             agent_id=self.agent.id
         )
-        # Poll for completion
-        import time
+        # Poll for completion with exponential backoff
+        delay = self.poll_initial
         while run.status in ["queued", "in_progress"]:
-            time.sleep(1)
+            time.sleep(delay)
+            delay = min(delay * 1.7, self.poll_max)
             run = self.client.agents.runs.get(thread_id=thread.id, run_id=run.id)
         if run.status == "completed":
-            messages = list(self.client.agents.messages.list(thread_id=thread.id))
-            if not messages:
+            # Only this run's newest messages are needed, not the whole thread;
+            # the pager is read lazily so no further pages are fetched
+            messages = self.client.agents.messages.list(
+                thread_id=thread.id,
+                run_id=run.id,
+                order=ListSortOrder.DESCENDING,
+                limit=5
+            )
+            # Find the newest assistant message with content
+            response_msg = next((m for m in messages if getattr(m, "role", None) == "assistant" and getattr(m, "content", None)), None)
+            if response_msg is None:
                 return {'text_response': 'No response from agent.', 'files': []}
-            # Find the first assistant message with content
-            response_msg = next((m for m in messages if getattr(m, "role", None) == "assistant" and getattr(m, "content", None)), messages[0])
             text_response = ''
             files = []
             if hasattr(response_msg, 'content') and response_msg.content:
@@ -103,10 +143,15 @@ When given data tasks:
                             'type': 'file',
                             'file_id': content.file.file_id
                         })
-            return {
+            result = {
                 'text_response': text_response,
                 'files': files
             }
+            # Results with files aren't cached: a replay would try to download
+            # file ids that may no longer exist
+            if new_thread and not files:
+                cache_response(self.agent.name, task_description, result)
+            return result
         else:
             error_msg = getattr(run, 'last_error', None)
             return {'text_response': f"Analysis failed: {run.status}. {error_msg if error_msg else ''}", 'files': []}
@@ -126,12 +171,16 @@ When given data tasks:
                 agents_client = self.client.agents
                 file_content_stream = agents_client.files.get_content(file_id)
                 
-                with open(filename, "wb") as f:
-                    for chunk in file_content_stream:
-                        if isinstance(chunk, (bytes, bytearray)):
-                            f.write(chunk)
-                        else:
-                            f.write(chunk.encode() if isinstance(chunk, str) else bytes(chunk))
+                with open(filename, "wb", buffering=DOWNLOAD_BUFFER_SIZE) as f:
+                    # A stream yields one chunk type throughout, so check it once
+                    chunks = iter(file_content_stream)
+                    first = next(chunks, b"")
+                    if isinstance(first, str):
+                        f.write(first.encode())
+                        f.writelines(chunk.encode() for chunk in chunks)
+                    else:
+                        f.write(first)
+                        f.writelines(chunks)
                 
                 print(f"Downloaded: {filename}")
                 return True
@@ -146,6 +195,27 @@ When given data tasks:
     #         print(f"Deleted agent: {self.agent.id}")
 
 
+async def analyze_all(analyst, tasks, max_concurrency=3):
+    """Run the analysis tasks concurrently and download each task's files as soon as it finishes
+    
+    At most max_concurrency runs are in flight at once. Returns (result,
+    downloaded filenames) pairs in task order.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def analyze(i, task):
+        async with semaphore:
+            result = await asyncio.to_thread(analyst.analyze_data, task['description'], new_thread=True)
+        filenames = [f"task_{i}_output_{j}.png" for j in range(1, len(result['files']) + 1)]
+        downloaded = await asyncio.gather(*(
+            asyncio.to_thread(analyst.download_file, file_info['file_id'], filename)
+            for file_info, filename in zip(result['files'], filenames)
+        ))
+        return result, [filename for filename, ok in zip(filenames, downloaded) if ok]
+    
+    return await asyncio.gather(*(analyze(i, task) for i, task in enumerate(tasks, 1)))
+
+
 def run_data_analysis_demo():
     """Demonstrate code interpreter capabilities"""
     print("📊 Starting Data Analysis Demo")
@@ -209,22 +279,24 @@ Tasks:
             }
         ]
         
-        for i, task in enumerate(tasks, 1):
+        # The analyses are independent, so each gets its own thread and their
+        # runs are in flight together with the waits overlapping; each task's
+        # files are downloaded while the other runs are still going
+        print(f"\nRunning {len(tasks)} analyses...")
+        results = asyncio.run(analyze_all(analyst, tasks))
+        
+        for i, (task, (result, downloaded)) in enumerate(zip(tasks, results), 1):
             print(f"\n--- Task {i}: {task['name']} ---")
             
-            result = analyst.analyze_data(task['description'])
-            
             # Display text response
             print("Analysis:")
             print(result['text_response'][:500] + "..." if len(result['text_response']) > 500 else result['text_response'])
             
-            # Download any generated files
+            # List the generated files that were downloaded
             if result['files']:
                 print(f"\nGenerated {len(result['files'])} files:")
-                for j, file_info in enumerate(result['files']):
-                    filename = f"task_{i}_output_{j+1}.png"
-                    if analyst.download_file(file_info['file_id'], filename):
-                        print(f"  - {filename}")
+                for filename in downloaded:
+                    print(f"  - {filename}")
         
         print("\n✅ Data analysis demo completed!")
         
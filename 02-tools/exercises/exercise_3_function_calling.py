@@ -1,12 +1,39 @@
 #!/usr/bin/env python3
 
-import os
-import json
+import re
 from datetime import datetime, timezone
-from dotenv import load_dotenv
-from azure.ai.projects import AIProjectClient
-from azure.identity import DefaultAzureCredential
-from azure.ai.agents.models import FunctionTool
+from functools import lru_cache, wraps
+from clients import get_project_client
+from config import settings
+from response_cache import get_cached_response, cache_response
+from azure.ai.agents.models import FunctionTool, MessageDeltaChunk, ThreadRun
+
+# Tool call arguments and outputs go through orjson when it is installed
+try:
+    from orjson import loads as _loads, dumps as _orjson_dumps
+
+    def _dumps(value):
+        return _orjson_dumps(value).decode()
+except ImportError:
+    from json import loads as _loads, dumps as _dumps
+
+# Agents indexed by name, filled from a single list_agents() scan per process
+_agents_by_name = None
+
+def find_agent(client, name):
+    """Return the newest agent with the given name, or None"""
+    global _agents_by_name
+    if _agents_by_name is None:
+        index = {}
+        for agent in client.agents.list_agents():
+            index.setdefault(agent.name, agent)  # listed newest first
+        _agents_by_name = index
+    return _agents_by_name.get(name)
+
+def remember_agent(agent):
+    """Add a newly created agent to the name index"""
+    if _agents_by_name is not None:
+        _agents_by_name[agent.name] = agent
 
 
 #1st user function - get_current_datetime
@@ -15,6 +42,21 @@ def get_current_datetime():
     return datetime.now(timezone.utc).isoformat()
 
 #2nd user function - calculate_mortgage
+@lru_cache(maxsize=512)
+def _mortgage_payments(principal, rate, years):
+    """Monthly, total and interest amounts for a loan; cached because the model often repeats a call"""
+    monthly_rate = rate / 100 / 12
+    num_payments = years * 12
+    
+    if monthly_rate == 0:
+        monthly_payment = principal / num_payments
+    else:
+        monthly_payment = principal * (monthly_rate * (1 + monthly_rate)**num_payments) / ((1 + monthly_rate)**num_payments - 1)
+    
+    total_payment = monthly_payment * num_payments
+    total_interest = total_payment - principal
+    return monthly_payment, total_payment, total_interest
+
 def calculate_mortgage(principal: float, rate: float, years: int):
     """
     Calculate monthly mortgage payment
@@ -27,16 +69,7 @@ def calculate_mortgage(principal: float, rate: float, years: int):
     Returns:
         dict: Payment details
     """
-    monthly_rate = rate / 100 / 12
-    num_payments = years * 12
-    
-    if monthly_rate == 0:
-        monthly_payment = principal / num_payments
-    else:
-        monthly_payment = principal * (monthly_rate * (1 + monthly_rate)**num_payments) / ((1 + monthly_rate)**num_payments - 1)
-    
-    total_payment = monthly_payment * num_payments
-    total_interest = total_payment - principal
+    monthly_payment, total_payment, total_interest = _mortgage_payments(principal, rate, years)
     
     return {
         "monthly_payment": round(monthly_payment, 2),
@@ -48,6 +81,8 @@ def calculate_mortgage(principal: float, rate: float, years: int):
     }
 
 #3rd user function - validate_email
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 def validate_email(email: str):
     """
     Validate email address format
@@ -58,10 +93,7 @@ def validate_email(email: str):
     Returns:
         dict: Validation result
     """
-    import re
-    
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    is_valid = bool(re.match(pattern, email))
+    is_valid = bool(EMAIL_PATTERN.match(email))
     
     return {
         "email": email,
@@ -70,6 +102,24 @@ def validate_email(email: str):
     }
 
 #4th user function - convert_temperature
+# Unit -> conversion to and from Celsius; unknown units are treated as Celsius
+_TO_C = {
+    'C': lambda t: t,
+    'F': lambda t: (t - 32) * 5/9,
+    'K': lambda t: t - 273.15
+}
+_FROM_C = {
+    'C': lambda t: t,
+    'F': lambda t: t * 9/5 + 32,
+    'K': lambda t: t + 273.15
+}
+
+@lru_cache(maxsize=512)
+def _convert_temperature_value(temperature, from_unit, to_unit):
+    """Converted temperature value, cached because the model often repeats a call"""
+    celsius = _TO_C.get(from_unit, _TO_C['C'])(temperature)
+    return _FROM_C.get(to_unit, _FROM_C['C'])(celsius)
+
 def convert_temperature(temperature: float, from_unit: str, to_unit: str):
     """
     Convert temperature between units
@@ -82,21 +132,7 @@ def convert_temperature(temperature: float, from_unit: str, to_unit: str):
     Returns:
         dict: Conversion result
     """
-    # Convert to Celsius first
-    if from_unit.upper() == 'F':
-        celsius = (temperature - 32) * 5/9
-    elif from_unit.upper() == 'K':
-        celsius = temperature - 273.15
-    else:
-        celsius = temperature
-    
-    # Convert from Celsius to target unit
-    if to_unit.upper() == 'F':
-        result = celsius * 9/5 + 32
-    elif to_unit.upper() == 'K':
-        result = celsius + 273.15
-    else:
-        result = celsius
+    result = _convert_temperature_value(temperature, from_unit.upper(), to_unit.upper())
     
     return {
         "original_temperature": temperature,
@@ -105,16 +141,29 @@ def convert_temperature(temperature: float, from_unit: str, to_unit: str):
         "converted_unit": to_unit.upper()
     }
 
+def json_output(func):
+    """Return a tool function's dict result as JSON; the SDK submits str(output), which would be a Python repr"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        output = func(*args, **kwargs)
+        return _dumps(output) if isinstance(output, dict) else str(output)
+    return wrapper
+
+# Tool name -> implementation, declared to the agent and executed by the SDK during runs
+TOOL_FUNCTIONS = {
+    func.__name__: json_output(func)
+    for func in (get_current_datetime, calculate_mortgage, validate_email, convert_temperature)
+}
+
 
 class BusinessLogicAgent:
-    def __init__(self):
-        load_dotenv()
-        self.client = AIProjectClient(
-            endpoint=os.getenv('PROJECT_ENDPOINT'),
-            credential=DefaultAzureCredential(),
-            api_version="2025-05-15-preview"
-        )
+    def __init__(self, client=None):
+        self.client = client or get_project_client(api_version="2025-05-15-preview")
         self.agent = None
+        self.thread = None  # persistent thread to reuse across requests
+        self.function_tool = FunctionTool(functions=set(TOOL_FUNCTIONS.values()))
+        # Let the SDK execute requested functions and submit their outputs on the run's stream
+        self.client.agents.enable_auto_function_calls(self.function_tool)
 
     def create_function_agent(self):
         """Create agent with custom function capabilities"""
@@ -122,27 +171,17 @@ class BusinessLogicAgent:
         
         # Check if agent already exists
         try:
-            existing_agents = self.client.agents.list_agents()
-            for agent in existing_agents:
-                if agent.name == agent_name:
-                    print(f"Using existing agent: {agent.id}")
-                    self.agent = agent
-                    return self.agent
+            agent = find_agent(self.client, agent_name)
+            if agent:
+                print(f"Using existing agent: {agent.id}")
+                self.agent = agent
+                return self.agent
         except Exception as e:
             print(f"Error checking existing agents: {e}")
         
         # Create new agent if none exists
-        user_functions = {
-            get_current_datetime,
-            calculate_mortgage,
-            validate_email,
-            convert_temperature
-        }
-        
-        function_tool = FunctionTool(functions=user_functions)
-        
         self.agent = self.client.agents.create_agent(
-            model=os.getenv('MODEL_DEPLOYMENT_NAME'),
+            model=settings.model_deployment_name,
             name=agent_name,
             instructions="""
 You are a helpful business assistant with access to utility functions.
@@ -159,15 +198,30 @@ When users ask for calculations or validations:
 3. Provide additional context when helpful
 4. Show your work for calculations
 """,
-            tools=function_tool.definitions
+            tools=self.function_tool.definitions
         )
         
+        remember_agent(self.agent)
         print(f"Created function agent: {self.agent.id}")
         return self.agent
 
-    def process_request(self, request):
-        """Process user request with function calling"""
-        thread = self.client.agents.threads.create()
+    def process_request(self, request, new_thread=False):
+        """Process user request with function calling
+        
+        Only replies on a new thread that needed no tool calls are cached: a
+        cached reply on the shared thread would skip posting the message, and
+        tool results (such as the current time) go stale.
+        """
+        if new_thread:
+            cached = get_cached_response(self.agent.name, request)
+            if cached is not None:
+                return cached
+            thread = self.client.agents.threads.create()
+        else:
+            # Reuse one thread across requests (create lazily if missing)
+            if self.thread is None:
+                self.thread = self.client.agents.threads.create()
+            thread = self.thread
         
         # Send user message
         self.client.agents.messages.create(
@@ -176,68 +230,33 @@ When users ask for calculations or validations:
             content=request
         )
         
-        # Create run and handle function calls
-        run = self.client.agents.runs.create(
+        # Stream the run: tool calls are executed and their outputs submitted
+        # on the same event stream, so there's no status polling or message fetch
+        run = None
+        chunks = []
+        called_tools = False
+        with self.client.agents.runs.stream(
             thread_id=thread.id,
             agent_id=self.agent.id
-        )
-        
-        # Poll for completion and handle tool calls
-        while run.status in ["queued", "in_progress", "requires_action"]:
-            if run.status == "requires_action":
-                tool_calls = run.required_action.submit_tool_outputs.tool_calls
-                tool_outputs = []
-                
-                for tool_call in tool_calls:
-                    function_name = tool_call.function.name
-                    function_args = json.loads(tool_call.function.arguments)
-                    
-                    print(f"Calling function: {function_name}")
-                    print(f"Arguments: {function_args}")
-                    
-                    # Execute the function
-                    if function_name == "get_current_datetime":
-                        output = get_current_datetime()
-                    elif function_name == "calculate_mortgage":
-                        output = calculate_mortgage(**function_args)
-                    elif function_name == "validate_email":
-                        output = validate_email(**function_args)
-                    elif function_name == "convert_temperature":
-                        output = convert_temperature(**function_args)
-                    else:
-                        output = f"Unknown function: {function_name}"
-                    
-                    tool_outputs.append({
-                        "tool_call_id": tool_call.id,
-                        "output": json.dumps(output) if isinstance(output, dict) else str(output)
-                    })
-                
-                # Submit tool outputs
-                self.client.agents.runs.submit_tool_outputs(
-                    thread_id=thread.id,
-                    run_id=run.id,
-                    tool_outputs=tool_outputs
-                )
-            
-            # Update run status
-            run = self.client.agents.runs.get(thread_id=thread.id, run_id=run.id)
+        ) as stream:
+            for _, event_data, _ in stream:
+                if isinstance(event_data, MessageDeltaChunk):
+                    chunks.append(event_data.text)
+                elif isinstance(event_data, ThreadRun):
+                    run = event_data
+                    if run.status == "requires_action":
+                        called_tools = True
+                        for tool_call in run.required_action.submit_tool_outputs.tool_calls:
+                            print(f"Calling function: {tool_call.function.name}")
+                            print(f"Arguments: {_loads(tool_call.function.arguments)}")
         
         # Get final response
-        if run.status == "completed":
-            try:
-                messages = self.client.agents.messages.list(thread_id=thread.id)
-                
-                # Find the agent's last text message
-                agent_response = None
-                for msg in messages:
-                    if msg.role == "assistant" and msg.text_messages:
-                        agent_response = msg.text_messages[-1].text.value
-                        break
-                
-                return agent_response if agent_response else "No response from agent"
-            except Exception as e:
-                print(f"Error retrieving agent response: {e}")
-                return "Error retrieving agent response"
+        if run and run.status == "completed":
+            agent_response = "".join(chunks)
+            if agent_response and new_thread and not called_tools:
+                cache_response(self.agent.name, request, agent_response)
+            return agent_response if agent_response else "No response from agent"
+        return f"Run ended with status: {run.status if run else 'unknown'}"
 
     # def cleanup(self):
     #     """Clean up resources"""
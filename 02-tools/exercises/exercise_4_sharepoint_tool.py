@@ -1,27 +1,18 @@
 #!/usr/bin/env python3
-import os
-from azure.ai.projects import AIProjectClient
-from azure.identity import DefaultAzureCredential
-from azure.ai.agents.models import SharepointTool
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
+import asyncio
+from itertools import islice
+from azure.ai.agents.models import ListSortOrder, SharepointTool
+from clients import get_project_client
+from config import settings
 
 class SharePointDemo:
-    def __init__(self):
+    def __init__(self, project_client=None):
         """Initialize the SharePoint Demo with Azure AI Foundry client"""
         # Validate required environment variables
-        required_vars = ["PROJECT_ENDPOINT", "MODEL_DEPLOYMENT_NAME", "SHAREPOINT_CONNECTION_NAME"]
-        for var in required_vars:
-            if not os.getenv(var):
-                raise EnvironmentError(f"Missing required environment variable: {var}")
+        settings.require("project_endpoint", "model_deployment_name", "sharepoint_connection_name")
         
-        # Initialize the AIProjectClient
-        self.project_client = AIProjectClient(
-            endpoint=os.environ["PROJECT_ENDPOINT"],
-            credential=DefaultAzureCredential(),
-        )
+        # Initialize the AIProjectClient (shared with the other tool exercises)
+        self.project_client = project_client or get_project_client()
         
         self.agent = None
         self.thread = None
@@ -29,7 +20,7 @@ class SharePointDemo:
     def setup_sharepoint_tool(self):
         """Setup SharePoint tool with the connection"""
         try:
-            connection_name = os.environ["SHAREPOINT_CONNECTION_NAME"]
+            connection_name = settings.sharepoint_connection_name
             
             conn = self.project_client.connections.get(name=connection_name)
             print(f"✅ Found SharePoint connection: {conn.id}")
@@ -48,7 +39,7 @@ class SharePointDemo:
         
         # Create agent with more specific SharePoint instructions
         self.agent = self.project_client.agents.create_agent(
-            model=os.environ["MODEL_DEPLOYMENT_NAME"],
+            model=settings.model_deployment_name,
             name="sharepoint-demo-agent",
             instructions="""You are a helpful assistant with access to SharePoint documents.
             
@@ -65,18 +56,24 @@ class SharePointDemo:
         print(f"✅ Created agent with SharePoint tool, ID: {self.agent.id}")
         return self.agent
     
-    def run_query(self, query):
-        """Run a query with the SharePoint agent"""
+    def run_query(self, query, new_thread=False, max_messages=2):
+        """Run a query with the SharePoint agent and show its newest max_messages messages"""
         if not self.agent:
             self.create_agent()
         
-        # Create thread
-        self.thread = self.project_client.agents.threads.create()
-        print(f"📝 Created thread, ID: {self.thread.id}")
+        # Create a thread for this query, or keep using the one from earlier queries
+        if new_thread:
+            thread = self.project_client.agents.threads.create()
+            print(f"📝 Created thread, ID: {thread.id}")
+        else:
+            if self.thread is None:
+                self.thread = self.project_client.agents.threads.create()
+                print(f"📝 Created thread, ID: {self.thread.id}")
+            thread = self.thread
         
         # Create message
         message = self.project_client.agents.messages.create(
-            thread_id=self.thread.id,
+            thread_id=thread.id,
             role="user",
             content=query
         )
@@ -85,7 +82,7 @@ class SharePointDemo:
         # Create and process run
         print("🔄 Processing query...")
         run = self.project_client.agents.runs.create_and_process(
-            thread_id=self.thread.id,
+            thread_id=thread.id,
             agent_id=self.agent.id
         )
         
@@ -95,14 +92,22 @@ class SharePointDemo:
             print(f"❌ Run failed: {run.last_error}")
             return None
         
-        # Fetch and display messages
-        messages = self.project_client.agents.messages.list(thread_id=self.thread.id)
-        print("\n📋 Conversation:")
-        print("-" * 40)
+        # Fetch only the newest messages (the prompt and the reply), oldest first for display
+        # (islice stops the pager after the first page instead of walking the whole thread)
+        newest = self.project_client.agents.messages.list(
+            thread_id=thread.id,
+            order=ListSortOrder.DESCENDING,
+            limit=max_messages
+        )
+        messages = list(islice(newest, max_messages))[::-1]
+        
+        # One print per query keeps the output of concurrent queries together
+        lines = ["\n📋 Conversation:", "-" * 40]
         for msg in messages:
             if msg.text_messages:
                 last_text = msg.text_messages[-1]
-                print(f"{msg.role.upper()}: {last_text.text.value}\n")
+                lines.append(f"{msg.role.upper()}: {last_text.text.value}\n")
+        print("\n".join(lines))
         
         return messages
     
@@ -116,6 +121,17 @@ class SharePointDemo:
     #             print(f"Error deleting agent: {e}")
 
 
+async def run_queries(demo, queries, max_concurrency=3):
+    """Run independent queries concurrently, each on its own thread, with at most max_concurrency runs at once"""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def run(query):
+        async with semaphore:
+            return await asyncio.to_thread(demo.run_query, query, new_thread=True)
+    
+    return await asyncio.gather(*(run(query) for query in queries))
+
+
 def run_sharepoint_demo():
     """Demonstrate SharePoint tool capabilities"""
     print("📂 SharePoint Tool Demo")
@@ -134,10 +150,10 @@ def run_sharepoint_demo():
             "Find information about company policies"
         ]
         
-        for query in queries:
-            print(f"\n🔍 Query: {query}")
-            print("-" * 40)
-            demo.run_query(query)
+        # The queries don't depend on each other, so their runs overlap
+        print(f"\n🔍 Running {len(queries)} queries...")
+        print("-" * 40)
+        asyncio.run(run_queries(demo, queries))
             
     except Exception as e:
         print(f"\n❌ Error running SharePoint demo: {e}")
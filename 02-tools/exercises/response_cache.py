@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Opt-in on-disk cache of agent responses, keyed by agent name and prompt
+
+Set AGENT_RESPONSE_CACHE=1 to replay earlier answers to identical prompts
+instead of running the agent again (useful when iterating on the demo code).
+"""
+
+import json
+import hashlib
+from pathlib import Path
+from config import settings
+
+# Cache files are read and written with orjson when it is installed
+try:
+    from orjson import loads as _loads, dumps as _dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(value):
+        return json.dumps(value).encode()
+
+CACHE_DIR = Path(".agent_cache")
+
+
+def cache_enabled():
+    """Whether response caching was switched on for this run"""
+    return settings.response_cache
+
+
+def _cache_path(agent_name, prompt):
+    key = hashlib.sha256(f"{agent_name}\n{prompt}".encode()).hexdigest()
+    return CACHE_DIR / f"{key}.json"
+
+
+def get_cached_response(agent_name, prompt):
+    """Return the stored response for this agent and prompt, or None"""
+    if not cache_enabled():
+        return None
+    try:
+        return _loads(_cache_path(agent_name, prompt).read_bytes())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def cache_response(agent_name, prompt, response):
+    """Store a JSON-serializable response for this agent and prompt"""
+    if not cache_enabled():
+        return
+    CACHE_DIR.mkdir(exist_ok=True)
+    _cache_path(agent_name, prompt).write_bytes(_dumps(response))
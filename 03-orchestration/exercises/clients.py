@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""Azure credential and HTTP transport shared by the orchestration exercises, created once per process"""
+
+import os
+from functools import lru_cache
+from azure.identity import AzureCliCredential, DefaultAzureCredential
+
+# Upper bound on pooled keep-alive connections; matches the exercises' default concurrency
+MAX_POOL_CONNECTIONS = 16
+
+
+@lru_cache(maxsize=1)
+def get_credential():
+    """Return a process-wide Azure credential, created on first use"""
+    # AZURE_USE_CLI_CRED=1 skips the credential chain and uses the Azure CLI login
+    if os.getenv("AZURE_USE_CLI_CRED") == "1":
+        return AzureCliCredential(process_timeout=10)
+    return DefaultAzureCredential(
+        exclude_interactive_browser_credential=True,
+        exclude_visual_studio_code_credential=True,
+        exclude_shared_token_cache_credential=True,
+        process_timeout=10
+    )
+
+
+@lru_cache(maxsize=1)
+def get_transport():
+    """Return a process-wide HTTP transport, backed by a bounded keep-alive connection pool"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from azure.core.pipeline.transport import RequestsTransport
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_POOL_CONNECTIONS)
+    session.mount("https://", adapter)
+    return RequestsTransport(session=session, session_owner=False, connection_timeout=10)
@@ -17,10 +17,10 @@ Pattern implemented here
 ------------------------
 1. Create 3 specialized agents (concept_extractor, writer, editor) with focused
    instructions.
-2. For each step, create a thread, post the previous step's output (seed text
-   for the first step is the raw product description), run the agent, and grab
-   the final AGENT message text.
-3. Pass that text as input to the next step.
+2. Create one thread for the pipeline. The first step is sent the raw product
+   description; each later step runs on the same thread, where the previous
+   step's reply already is, and is only told to continue from it.
+3. Collect each AGENT reply as it streams in.
 4. Print intermediate and final outputs.
 
 Key differences from the SK sample
@@ -44,21 +44,66 @@ Environment variables required
 Usage
 -----
 python3 exercise_2.2_agents_sequential.py
+python3 exercise_2.2_agents_sequential.py "description one" "description two" ...
+
+With several product descriptions the pipelines run concurrently, one thread
+per description, and only the final copy of each is printed.
+All runs go through llm_gateway, which caps runs in flight (MAX_IN_FLIGHT) and
+their start rate (RPM), and pauses every pipeline on a 429 for its Retry-After.
 
 Cleanup
 -------
-The script does *not* delete the created agents so you can inspect them; uncomment
-the cleanup section if you re-run often.
+The script does *not* delete the created agents so you can inspect them. Later
+runs reuse them (matched by name, with an instructions hash in their metadata),
+updating an agent in place when its model or instructions change.
 """
 from __future__ import annotations
 
 import os
-from typing import Optional
+import asyncio
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from dotenv import load_dotenv
-from azure.identity import DefaultAzureCredential
 from azure.ai.agents import AgentsClient
-from azure.ai.agents.models import MessageRole, ListSortOrder
+from azure.ai.agents.models import MessageDeltaChunk, MessageRole, ThreadMessageOptions, ThreadRun
+from clients import get_credential, get_transport
+from llm_gateway import get_gateway
+
+
+# Instructions are module constants so every run sends a byte-identical system
+# prompt, which keeps the prompt prefix eligible for the service's prompt caching
+CONCEPT_EXTRACTOR_INSTRUCTIONS = (
+    "You are a marketing analyst. Given a product description, identify:\n"
+    "Return three clearly labeled sections: Key Features, Target Audience, Unique Selling Points.\n"
+    "Keep each bullet concise."
+)
+WRITER_INSTRUCTIONS = (
+    "You are a marketing copywriter. Given structured feature/audience/USP text, write ~150 words of compelling copy.\n"
+    "Return ONLY the copy (single block)."
+)
+EDITOR_INSTRUCTIONS = (
+    "You are an editor. Polish the draft: fix grammar, tighten wording, keep tone persuasive and clear.\n"
+    "Return ONLY the final polished copy (single block)."
+)
+# Sent to every stage after the first: the previous stage's reply is already on
+# the shared thread, so it isn't sent again
+PIPELINE_CONTINUE_MESSAGE = "Continue with your task, using the previous reply in this conversation as your input."
+
+
+# Opt-in (AGENT_RESPONSE_CACHE=1) exact-match cache of outputs for this process,
+# so repeated descriptions in a batch don't re-run the agents. Whole pipelines are
+# cached, never single stages: a stage hit posts nothing, so the next stage on
+# the shared thread would be left without its turn
+RESPONSE_CACHE_ENABLED = os.getenv("AGENT_RESPONSE_CACHE") == "1"
+_response_cache: Dict[Tuple[str, str], Any] = {}
+
+
+def _cache_key(agent_id: str, input_text: str) -> Tuple[str, str]:
+    return agent_id, hashlib.sha256(input_text.encode("utf-8")).hexdigest()
 
 
 def require_env(name: str) -> str:
@@ -68,86 +113,169 @@ def require_env(name: str) -> str:
     return value
 
 
+@lru_cache(maxsize=None)
+def get_client(endpoint: str) -> AgentsClient:
+    """Return one AgentsClient per endpoint and process, on the shared credential and transport."""
+    return AgentsClient(endpoint=endpoint, credential=get_credential(), transport=get_transport())
+
+
+# Agents by name, filled from a single list_agents() call per process
+_AGENT_REGISTRY: Optional[Dict[str, Any]] = None
+
+
+def load_agent_registry(client: AgentsClient) -> Dict[str, Any]:
+    """Fill the agent registry from list_agents() on first use and return it."""
+    global _AGENT_REGISTRY
+    if _AGENT_REGISTRY is None:
+        _AGENT_REGISTRY = {}
+        for existing in client.list_agents():
+            _AGENT_REGISTRY.setdefault(existing.name, existing)  # listed newest first
+    return _AGENT_REGISTRY
+
+
+def get_or_create_agent(client: AgentsClient, name: str, model: str, instructions: str):
+    """Return the agent with this name, updating it if its model or instructions changed, or create it."""
+    load_agent_registry(client)
+    metadata = {"instructions_sha256": hashlib.sha256(instructions.encode("utf-8")).hexdigest()}
+    agent = _AGENT_REGISTRY.get(name)
+    if agent is None:
+        agent = client.create_agent(model=model, name=name, instructions=instructions, metadata=metadata)
+    elif agent.model != model or (agent.metadata or {}).get("instructions_sha256") != metadata["instructions_sha256"]:
+        agent = client.update_agent(agent.id, model=model, instructions=instructions, metadata=metadata)
+    _AGENT_REGISTRY[name] = agent
+    return agent
+
+
 def create_specialist_agents(client: AgentsClient, model: str):
-    """Create and return the three specialist agents used in the pipeline."""
-    concept_extractor = client.create_agent(
-        model=model,
-        name="concept_extractor_agent",
-        instructions=(
-            "You are a marketing analyst. Given a product description, identify:\n"
-            "Return three clearly labeled sections: Key Features, Target Audience, Unique Selling Points.\n"
-            "Keep each bullet concise."
-        ),
-    )
-    writer = client.create_agent(
-        model=model,
-        name="writer_agent",
-        instructions=(
-            "You are a marketing copywriter. Given structured feature/audience/USP text, write ~150 words of compelling copy.\n"
-            "Return ONLY the copy (single block)."
-        ),
-    )
-    editor = client.create_agent(
-        model=model,
-        name="editor_agent",
-        instructions=(
-            "You are an editor. Polish the draft: fix grammar, tighten wording, keep tone persuasive and clear.\n"
-            "Return ONLY the final polished copy (single block)."
-        ),
-    )
+    """Return the three specialist agents used in the pipeline, creating them on first use.
+
+    The registry is loaded first, then the three independent create/update
+    calls run concurrently, so a cold start costs one round trip instead of three.
+    """
+    specs = [
+        ("concept_extractor_agent", CONCEPT_EXTRACTOR_INSTRUCTIONS),
+        ("writer_agent", WRITER_INSTRUCTIONS),
+        ("editor_agent", EDITOR_INSTRUCTIONS),
+    ]
+    load_agent_registry(client)
+    with ThreadPoolExecutor(max_workers=len(specs)) as executor:
+        concept_extractor, writer, editor = executor.map(
+            lambda spec: get_or_create_agent(client, spec[0], model, spec[1]), specs
+        )
     return concept_extractor, writer, editor
 
 
-def run_single_step(client: AgentsClient, agent_id: str, input_text: str, timeout_seconds: int = 60) -> str:
-    """Run one agent on an input payload and return its output text."""
-    thread = client.threads.create()
-    client.messages.create(
-        thread_id=thread.id,
-        role=MessageRole.USER,
-        content=input_text,
-    )
-    run = client.runs.create_and_process(thread_id=thread.id, agent_id=agent_id)
-    if run.status == "failed":
-        raise RuntimeError(f"Run failed for agent {agent_id}: {run.last_error}")
-    # Fetch messages ascending, find last AGENT response
-    messages = client.messages.list(thread_id=thread.id, order=ListSortOrder.ASCENDING)
-    latest: Optional[str] = None
-    for m in messages:
-        if m.role == MessageRole.AGENT and m.text_messages:
-            latest = m.text_messages[-1].text.value
+def stream_run(client: AgentsClient, thread_id: str, agent_id: str, input_text: str) -> Tuple[Optional[ThreadRun], str]:
+    """Stream one run of an agent on a thread and return its final run event and reply text."""
+    run: Optional[ThreadRun] = None
+    chunks = []
+    with client.runs.stream(
+        thread_id=thread_id,
+        agent_id=agent_id,
+        additional_messages=[ThreadMessageOptions(role=MessageRole.USER, content=input_text)],
+    ) as stream:
+        for _, event_data, _ in stream:
+            if isinstance(event_data, MessageDeltaChunk):
+                chunks.append(event_data.text)
+            elif isinstance(event_data, ThreadRun):
+                run = event_data
+    return run, "".join(chunks)
+
+
+def run_agent_on_thread(client: AgentsClient, thread_id: str, agent_id: str, input_text: str) -> str:
+    """Post an input payload to a thread, run one agent on it and return its output text.
+
+    The input is sent with the run request and the reply is read from the run's
+    event stream, so there is no status polling or message listing.
+    """
+    # The gateway bounds concurrent runs across a batch and backs off when throttled
+    run, latest = get_gateway().call(stream_run, client, thread_id, agent_id, input_text)
+    # Cancelled, expired and incomplete runs may have streamed partial output
+    if run is None or run.status != "completed":
+        raise RuntimeError(
+            f"Run {run.status if run else 'produced no events'} for agent {agent_id}: "
+            f"{run.last_error if run else 'no run events'}"
+        )
     if not latest:
         raise RuntimeError(f"No agent output found for agent {agent_id}")
     return latest
 
 
+def run_pipeline(client: AgentsClient, agent_ids: Sequence[str], product_description: str) -> List[str]:
+    """Run every stage for one description on a thread of its own and return each stage's output."""
+    # The whole pipeline runs on a fresh thread, so it is cached as one unit
+    key = _cache_key(",".join(agent_ids), product_description)
+    if RESPONSE_CACHE_ENABLED and key in _response_cache:
+        return list(_response_cache[key])
+    thread = client.threads.create()
+    outputs = []
+    message = product_description
+    for agent_id in agent_ids:
+        outputs.append(run_agent_on_thread(client, thread.id, agent_id, message))
+        message = PIPELINE_CONTINUE_MESSAGE
+    if RESPONSE_CACHE_ENABLED:
+        _response_cache[key] = tuple(outputs)
+    return outputs
+
+
+async def run_pipeline_batch(
+    client: AgentsClient, agent_ids: Sequence[str], descriptions: Sequence[str], max_concurrency: int = 16
+) -> List[List[str]]:
+    """Run the pipeline for many descriptions concurrently and return their outputs in input order.
+
+    The descriptions are independent, so their pipelines overlap; at most
+    max_concurrency of them are in flight at once.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(description: str) -> List[str]:
+        async with semaphore:
+            return await asyncio.to_thread(run_pipeline, client, agent_ids, description)
+
+    return await asyncio.gather(*(run_one(description) for description in descriptions))
+
+
 def print_step(title: str, content: str):
     bar = "-" * len(title)
     print(f"\n{title}\n{bar}\n{content}\n")
 
 
-def main():
+def main(descriptions: Sequence[str] = ()):
     load_dotenv()
     endpoint = os.getenv("PROJECT_ENDPOINT") or os.getenv("AZURE_AI_PROJECT_ENDPOINT")
     if not endpoint:
         raise RuntimeError("Set PROJECT_ENDPOINT or AZURE_AI_PROJECT_ENDPOINT")
     model = require_env("MODEL_DEPLOYMENT_NAME")
-    credential = DefaultAzureCredential(exclude_environment_credential=True, exclude_managed_identity_credential=True)
-    client = AgentsClient(endpoint=endpoint, credential=credential)
+    # Cached: a second main() in the same process reuses the client and its token
+    client = get_client(endpoint)
     product_description = "An eco-friendly stainless steel water bottle that keeps drinks cold for 24 hours"
-    with client:
-        concept_agent, writer_agent, editor_agent = create_specialist_agents(client, model)
-        concepts = run_single_step(client, concept_agent.id, product_description)
-        print_step("Concept Extractor Output", concepts)
-        draft_copy = run_single_step(client, writer_agent.id, concepts)
-        print_step("Writer Draft Output", draft_copy)
-        final_copy = run_single_step(client, editor_agent.id, draft_copy)
-        print_step("Final Edited Copy", final_copy)
-        print("Sequential pipeline complete.")
-        # Optional cleanup
-        # client.delete_agent(concept_agent.id)
-        # client.delete_agent(writer_agent.id)
-        # client.delete_agent(editor_agent.id)
+    concept_agent, writer_agent, editor_agent = create_specialist_agents(client, model)
+    agent_ids = [concept_agent.id, writer_agent.id, editor_agent.id]
+    if len(descriptions) > 1:
+        batch_outputs = asyncio.run(run_pipeline_batch(client, agent_ids, descriptions))
+        for description, outputs in zip(descriptions, batch_outputs):
+            print_step(f"Final Edited Copy: {description}", outputs[-1])
+        print(f"Sequential pipeline complete for {len(descriptions)} descriptions.")
+        return
+    if descriptions:
+        product_description = descriptions[0]
+    concepts, draft_copy, final_copy = run_pipeline(client, agent_ids, product_description)
+    print_step("Concept Extractor Output", concepts)
+    print_step("Writer Draft Output", draft_copy)
+    print_step("Final Edited Copy", final_copy)
+    print("Sequential pipeline complete.")
+    # Optional cleanup
+    # client.delete_agent(concept_agent.id)
+    # client.delete_agent(writer_agent.id)
+    # client.delete_agent(editor_agent.id)
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Run the concept -> writer -> editor agent pipeline")
+    parser.add_argument(
+        "descriptions",
+        nargs="*",
+        help="product descriptions to process (several run as a concurrent batch)"
+    )
+    args = parser.parse_args()
+    main(args.descriptions)
@@ -2,12 +2,15 @@
 
 import os
 import asyncio
+import hashlib
 import json
+import time
 from typing import Dict, Any, Optional, List, AsyncIterable
-from datetime import datetime
+from dataclasses import dataclass, asdict, is_dataclass
 from dotenv import load_dotenv
-from azure.identity import DefaultAzureCredential
 from azure.ai.projects import enable_telemetry
+from clients import get_credential, get_transport
+from llm_gateway import get_gateway
 
 # Load environment variables
 load_dotenv()
@@ -26,6 +29,7 @@ from semantic_kernel.kernel import Kernel
 
 # Azure AI Foundry imports
 from azure.ai.projects import AIProjectClient
+from azure.ai.agents.models import MessageDeltaChunk, ThreadMessageOptions, ThreadRun
 
 # OpenTelemetry / Azure Monitor
 from opentelemetry import trace
@@ -47,7 +51,8 @@ def configure_tracing(project_endpoint: Optional[str]) -> None:
         try:
             tmp_client = AIProjectClient(
                 endpoint=project_endpoint,
-                credential=DefaultAzureCredential()
+                credential=get_credential(),
+                transport=get_transport()
             )
             connection_string = tmp_client.telemetry.get_application_insights_connection_string()
             if connection_string:
@@ -56,6 +61,11 @@ def configure_tracing(project_endpoint: Optional[str]) -> None:
             print(f"⚠️ Could not get connection string from project: {e}")
 
     if connection_string:
+        # The distro exports through a BatchSpanProcessor; size its batches for
+        # batch runs unless the standard OTEL_BSP_* variables are already set
+        os.environ.setdefault("OTEL_BSP_MAX_QUEUE_SIZE", "4096")
+        os.environ.setdefault("OTEL_BSP_SCHEDULE_DELAY", "2000")
+        os.environ.setdefault("OTEL_BSP_MAX_EXPORT_BATCH_SIZE", "512")
         configure_azure_monitor(
             connection_string=connection_string,
             service_name=os.getenv("OTEL_SERVICE_NAME", "semantic-kernel-agents"),
@@ -70,6 +80,93 @@ def configure_tracing(project_endpoint: Optional[str]) -> None:
 # Get a tracer for custom spans
 tracer = trace.get_tracer(__name__)
 
+# Span attribute keys used on every agent call
+ATTR_AGENT_NAME = "agent.name"
+ATTR_AGENT_ID = "agent.id"
+ATTR_INPUT_MESSAGE = "input.message"
+ATTR_OUTPUT_MESSAGE = "output.message"
+ATTR_CACHE_HIT = "cache.hit"
+ATTR_TIMEOUT = "timeout"
+ATTR_THREAD_ID = "thread.id"
+ATTR_RUN_ID = "run.id"
+ATTR_RUN_STATUS = "run.status"
+
+# Message text is only copied onto spans when content recording is enabled
+RECORD_CONTENT = os.getenv("AZURE_TRACING_GEN_AI_CONTENT_RECORDING_ENABLED", "false").lower() == "true"
+
+# Opt-in (AGENT_RESPONSE_CACHE=1) exact-match cache of agent replies for this
+# process, keyed by Foundry agent id and message
+RESPONSE_CACHE_ENABLED = os.getenv("AGENT_RESPONSE_CACHE") == "1"
+_response_cache: Dict[tuple, str] = {}
+
+# Longest a single agent run may take once it holds a gateway slot
+RUN_TIMEOUT_SECONDS = 60
+# Run states that still block new runs on the same thread
+ACTIVE_RUN_STATUSES = {"queued", "in_progress", "requires_action", "cancelling"}
+
+# Specialist instructions are module constants so every run sends a byte-identical
+# system prompt, which keeps the prompt prefix eligible for the service's prompt caching
+SPECIALIST_INSTRUCTIONS = {
+    'research-specialist': """You are a research specialist. Your role:
+                - Gather comprehensive information on topics
+                - Identify credible sources and data
+                - Synthesize findings into clear summaries
+                - Highlight key insights and trends""",
+    'analysis-specialist': """You are an analysis expert. Your role:
+                - Analyze research data for patterns
+                - Identify strategic opportunities
+                - Assess risks and challenges
+                - Provide data-driven recommendations""",
+    'writing-specialist': """You are a professional writer. Your role:
+                - Transform analysis into polished documents
+                - Maintain professional tone and style
+                - Structure content with clear sections
+                - Create executive summaries"""
+}
+
+# Per-stage prompt templates, built once at import. Fixed wording comes first and
+# the variable parts last, so requests share a common prefix
+SEQUENTIAL_TASK_TEMPLATE = """
+        Create a comprehensive report. Please coordinate the following:
+        1. Research the topic thoroughly
+        2. Analyze the findings for insights
+        3. Create a professional document with recommendations
+        Topic: {topic}
+        Focus area: {focus_area}
+        """
+SEQUENTIAL_CONTINUE_MESSAGE = "Based on the previous work in this conversation, please continue with your specialized task."
+DISCUSSION_TEMPLATE = "Let's discuss: {topic}"
+DISCUSSION_FOLLOWUP_TEMPLATE = "The other participants said:\n\n{replies}\n\nRespond to their points from your specialist perspective."
+RESEARCH_TEMPLATE = "Research this topic: {goal}"
+ANALYSIS_TEMPLATE = "Analyze these findings: {findings}"
+BRIEFING_TEMPLATE = "Create executive briefing from: {analysis}"
+COMBINED_TEMPLATE = "Analyze these findings and write an executive briefing: {findings}"
+
+# FUSE_STAGES=1 runs the hybrid demo's analysis and writing phases as one call
+# to a combined agent, saving a round trip; unset keeps the three-phase version
+FUSE_STAGES = os.getenv("FUSE_STAGES") == "1"
+COMBINED_AGENT_NAME = 'combined-analyst-writer'
+COMBINED_INSTRUCTIONS = """You are an analysis expert and a professional writer. Given research findings, produce:
+                1. An analysis: patterns, strategic opportunities, risks and data-driven recommendations
+                2. A polished executive briefing based on that analysis
+                Return only a JSON object of the form {"analysis": "...", "briefing": "..."}"""
+
+@dataclass(slots=True)
+class Turn:
+    """One agent reply in an orchestration; t_ns is time.monotonic_ns() at the start of its stage"""
+    agent: str
+    phase: str
+    content: str
+    t_ns: int
+
+class AgentRunError(Exception):
+    """An agent produced no usable reply: the run timed out, failed or raised"""
+
+def parse_json_reply(text: str) -> Dict[str, Any]:
+    """Parse a JSON object from an agent reply, ignoring any text around it"""
+    start, end = text.find("{"), text.rfind("}")
+    return json.loads(text[start:end + 1])
+
 # --- Direct SK Agent wrapper for Azure AI Foundry agents ---
 
 class AzureAIFoundrySKAgent(Agent):
@@ -89,22 +186,33 @@ class AzureAIFoundrySKAgent(Agent):
         self._project_client = project_client
         self._foundry_agent = foundry_agent
 
-    async def invoke(self, messages: List[ChatMessageContent]) -> AsyncIterable[ChatMessageContent]:
+    async def invoke(self, messages: List[ChatMessageContent], thread_id: Optional[str] = None) -> AsyncIterable[ChatMessageContent]:
         """
-        Implements the SK Agent interface.
+        Implements the SK Agent interface. Pass thread_id to continue an existing Foundry thread.
         """
-        # Extract the last user message
-        user_message = ""
-        for msg in reversed(messages):
-            if msg.role == AuthorRole.USER:
-                user_message = str(msg.content)
-                break
+        yield await self.get_response_from_history(messages, thread_id=thread_id)
 
-        if not user_message:
-            user_message = str(messages[-1].content) if messages else ""
+    async def get_response_from_history(self, messages: List[ChatMessageContent], thread_id: Optional[str] = None) -> ChatMessageContent:
+        """
+        Answer the last user message in the history with a single reply message.
+        """
+        # Usually the newest message is the user's prompt, so scan back only otherwise
+        if messages and messages[-1].role == AuthorRole.USER:
+            user_message = str(messages[-1].content)
+        else:
+            user_message = next(
+                (str(msg.content) for msg in reversed(messages) if msg.role == AuthorRole.USER),
+                str(messages[-1].content) if messages else ""
+            )
+        return await self.invoke_one(user_message, thread_id=thread_id)
 
-        response = await self.get_response(user_message)
-        yield ChatMessageContent(role=AuthorRole.ASSISTANT, content=response, name=self.name)
+    async def invoke_one(self, user_text: str, thread_id: Optional[str] = None) -> ChatMessageContent:
+        """
+        Answer a single user prompt; for callers that already know the prompt and have no history to scan.
+        Raises AgentRunError if the agent produced no reply.
+        """
+        response = await self.respond(user_text, thread_id=thread_id)
+        return ChatMessageContent(role=AuthorRole.ASSISTANT, content=response, name=self.name)
 
     async def invoke_stream(self, messages: List[ChatMessageContent]) -> AsyncIterable[ChatMessageContent]:
         """
@@ -113,80 +221,123 @@ class AzureAIFoundrySKAgent(Agent):
         async for message in self.invoke(messages):
             yield message
 
+    async def get_response(self, message: str, context: Optional[Dict[str, Any]] = None, thread_id: Optional[str] = None) -> str:
+        """
+        Get response from Azure AI Foundry agent, with failures returned as "Error: ..." text.
+        """
+        try:
+            return await self.respond(message, thread_id=thread_id)
+        except AgentRunError as e:
+            return f"Error: {e}"
+
     @tracer.start_as_current_span("agent_response")
-    async def get_response(self, message: str, context: Optional[Dict[str, Any]] = None) -> str:
+    async def respond(self, message: str, thread_id: Optional[str] = None) -> str:
         """
         Get response from Azure AI Foundry agent with proper tracing.
+        Runs on thread_id when given, otherwise on a new thread.
+        Raises AgentRunError on timeout, a run that didn't complete, or any other failure.
         """
         span = trace.get_current_span()
-        span.set_attribute("agent.name", self.name)
-        span.set_attribute("agent.id", self._foundry_agent.id)
-        span.set_attribute("input.message", (message or "")[:500])  # Truncate for readability
-
+        # Skip truncating message text for spans that are not sampled
+        record_content = RECORD_CONTENT and span.is_recording()
+        span.set_attribute(ATTR_AGENT_NAME, self.name)
+        span.set_attribute(ATTR_AGENT_ID, self._foundry_agent.id)
+        if record_content:
+            span.set_attribute(ATTR_INPUT_MESSAGE, (message or "")[:500])  # Truncate for readability
+
+        # A reply on a continued thread depends on the conversation, not just the message
+        use_cache = RESPONSE_CACHE_ENABLED and thread_id is None
+        cache_key = (self._foundry_agent.id, hashlib.sha256((message or "").encode("utf-8")).hexdigest())
+        if use_cache and cache_key in _response_cache:
+            span.set_attribute(ATTR_CACHE_HIT, True)
+            return _response_cache[cache_key]
+
+        # Stream the run on a worker thread so the event loop stays free; the
+        # reply arrives as deltas and the final run event carries the status.
+        # The gateway bounds concurrent runs and backs off when throttled; the
+        # timeout is enforced inside the worker, so time spent waiting for a
+        # slot doesn't count and a timed-out run is cancelled, not orphaned
         try:
-            # Create thread - automatically traced by Azure SDK
-            thread = self._project_client.agents.threads.create()
-            span.set_attribute("thread.id", thread.id)
-
-            # Create message
-            self._project_client.agents.messages.create(
-                thread_id=thread.id,
-                role="user",
-                content=message
-            )
-
-            # Create run and wait for completion
-            run = self._project_client.agents.runs.create(
-                thread_id=thread.id,
-                agent_id=self._foundry_agent.id
+            # Create thread unless continuing one - outside the gateway call, so
+            # a throttled retry re-sends only the run, not another new thread
+            if thread_id is None:
+                thread_id = (await asyncio.to_thread(self._project_client.agents.threads.create)).id
+            run, result = await asyncio.to_thread(
+                get_gateway().call, self._stream_run, message, thread_id, RUN_TIMEOUT_SECONDS
             )
-            span.set_attribute("run.id", run.id)
-
-            # Async-friendly polling loop
-            max_wait_time = 60  # seconds
-            loop = asyncio.get_running_loop()
-            start_time = loop.time()
-
-            while run.status in ("queued", "in_progress", "requires_action"):
-                if loop.time() - start_time > max_wait_time:
-                    span.set_attribute("timeout", True)
-                    span.set_attribute("run.status", "timeout")
-                    return f"Error: Request timed out after {max_wait_time} seconds"
-
-                await asyncio.sleep(1)
-                run = self._project_client.agents.runs.get(thread_id=thread.id, run_id=run.id)
-
-                if run.status == "requires_action":
-                    # Record tool-calling requirement if added later
-                    span.add_event("run.requires_action", {"run.id": run.id})
-                    break
-
-            span.set_attribute("run.status", run.status)
-
-            if run.status == "completed":
-                messages = self._project_client.agents.messages.list(thread_id=thread.id)
-                for msg in messages:
-                    if getattr(msg, "role", None) == "assistant":
-                        result = ""
-                        if hasattr(msg, "content") and msg.content:
-                            if isinstance(msg.content, list) and len(msg.content) > 0:
-                                content_item = msg.content[0]
-                                if hasattr(content_item, "text"):
-                                    result = getattr(content_item.text, "value", str(content_item.text))
-                                else:
-                                    result = str(content_item)
-                            else:
-                                result = str(msg.content)
-
-                        span.set_attribute("output.message", (result or "")[:500])
-                        return result
-
-            return f"Error: Run ended with status {run.status}"
-
+        except TimeoutError as e:
+            span.set_attribute(ATTR_TIMEOUT, True)
+            span.set_attribute(ATTR_RUN_STATUS, "timeout")
+            raise AgentRunError(f"Request timed out after {RUN_TIMEOUT_SECONDS} seconds") from e
         except Exception as e:
             span.record_exception(e)
             span.set_status(Status(StatusCode.ERROR, str(e)))
-            return f"Error: {str(e)}"
+            raise AgentRunError(str(e)) from e
+
+        span.set_attribute(ATTR_THREAD_ID, thread_id)
+        if run is None:
+            raise AgentRunError("Run produced no status events")
+        span.set_attribute(ATTR_RUN_ID, run.id)
+        span.set_attribute(ATTR_RUN_STATUS, run.status)
+
+        if run.status != "completed":
+            raise AgentRunError(f"Run ended with status {run.status}")
+
+        if record_content:
+            span.set_attribute(ATTR_OUTPUT_MESSAGE, result[:500])
+        if use_cache:
+            _response_cache[cache_key] = result
+        return result
+
+    def _stream_run(self, message: str, thread_id: str, timeout: float):
+        """Run the agent on a thread and return (final run, reply text).
+        Cancels the run and raises TimeoutError if it takes longer than timeout seconds."""
+        # Called while holding a gateway slot, so the clock starts here
+        deadline = time.monotonic() + timeout
+
+        # The message is sent with the run request instead of a separate call
+        run = None
+        chunks = []
+        try:
+            # read_timeout bounds a silent stream; the deadline bounds a slow one
+            with self._project_client.agents.runs.stream(
+                thread_id=thread_id,
+                agent_id=self._foundry_agent.id,
+                additional_messages=[ThreadMessageOptions(role="user", content=message)],
+                read_timeout=timeout
+            ) as stream:
+                for _, event_data, _ in stream:
+                    if isinstance(event_data, MessageDeltaChunk):
+                        chunks.append(event_data.text)
+                    elif isinstance(event_data, ThreadRun):
+                        run = event_data
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(f"Run timed out after {timeout} seconds")
+        except Exception:
+            # Don't leave a run going that nobody will read, and keep the thread usable
+            if run is not None and run.status in ACTIVE_RUN_STATUSES:
+                self._cancel_run(thread_id, run.id)
+            raise
+        return run, "".join(chunks)
+
+    def _cancel_run(self, thread_id: str, run_id: str) -> None:
+        """Cancel a run and wait briefly for it to stop, so the thread accepts new runs"""
+        runs = self._project_client.agents.runs
+        try:
+            run = runs.cancel(thread_id=thread_id, run_id=run_id)
+            delay = 0.1
+            for _ in range(10):
+                if run.status not in ACTIVE_RUN_STATUSES:
+                    return
+                time.sleep(delay)
+                delay = min(delay * 2, 2.0)
+                run = runs.get(thread_id=thread_id, run_id=run_id)
+        except Exception as e:
+            print(f"⚠️ Could not cancel run {run_id}: {e}")
+
+def demo_print(label: str, text: str = "") -> None:
+    """Print text with every line tagged by its demo, since the demos' output interleaves"""
+    print("\n".join(f"[{label}] {line}" if line else line for line in text.split("\n")))
 
 # --- Orchestrator ---
 
@@ -200,7 +351,7 @@ class SemanticKernelOrchestrator:
         self.foundry_agents = {}
         self.sk_agents = {}
         self.ai_client = None
-        self.credential = DefaultAzureCredential()
+        self.credential = get_credential()
 
     async def setup_kernel(self):
         """Initialize Semantic Kernel with AI Project client for tracing"""
@@ -217,7 +368,8 @@ class SemanticKernelOrchestrator:
         # Initialize AI client
         self.ai_client = AIProjectClient(
             endpoint=project_endpoint,
-            credential=self.credential
+            credential=self.credential,
+            transport=get_transport()
         )
 
         print("✅ Semantic Kernel initialized")
@@ -226,54 +378,45 @@ class SemanticKernelOrchestrator:
         """Create or reuse Azure AI Foundry agents"""
         print("🤖 Creating Azure AI Foundry agents...")
 
+        model = os.getenv('MODEL_DEPLOYMENT_NAME', 'gpt-4o-mini')
         agent_configs = [
-            {
-                'name': 'research-specialist',
-                'model': os.getenv('MODEL_DEPLOYMENT_NAME', 'gpt-4o-mini'),
-                'instructions': """You are a research specialist. Your role:
-                - Gather comprehensive information on topics
-                - Identify credible sources and data
-                - Synthesize findings into clear summaries
-                - Highlight key insights and trends"""
-            },
-            {
-                'name': 'analysis-specialist',
-                'model': os.getenv('MODEL_DEPLOYMENT_NAME', 'gpt-4o-mini'),
-                'instructions': """You are an analysis expert. Your role:
-                - Analyze research data for patterns
-                - Identify strategic opportunities
-                - Assess risks and challenges
-                - Provide data-driven recommendations"""
-            },
-            {
-                'name': 'writing-specialist',
-                'model': os.getenv('MODEL_DEPLOYMENT_NAME', 'gpt-4o-mini'),
-                'instructions': """You are a professional writer. Your role:
-                - Transform analysis into polished documents
-                - Maintain professional tone and style
-                - Structure content with clear sections
-                - Create executive summaries"""
-            }
+            {'name': name, 'model': model, 'instructions': instructions}
+            for name, instructions in SPECIALIST_INSTRUCTIONS.items()
         ]
+        if FUSE_STAGES:
+            agent_configs.append({'name': COMBINED_AGENT_NAME, 'model': model, 'instructions': COMBINED_INSTRUCTIONS})
+
+        # One list_agents() pass for all configs, indexed by name (listed newest first)
+        existing_agents = {}
+        try:
+            listed = await asyncio.to_thread(lambda: list(self.ai_client.agents.list_agents()))
+            for existing_agent in listed:
+                existing_agents.setdefault(existing_agent.name, existing_agent)
+        except Exception as e:
+            print(f"⚠️ Could not list existing agents: {e}")
+
+        # The missing agents are independent, so they are all created concurrently
+        missing = [config for config in agent_configs if config['name'] not in existing_agents]
+        created = await asyncio.gather(*(
+            asyncio.to_thread(
+                self.ai_client.agents.create_agent,
+                model=config['model'],
+                name=config['name'],
+                instructions=config['instructions']
+            )
+            for config in missing
+        ), return_exceptions=True)
+        created_agents = dict(zip((config['name'] for config in missing), created))
 
         for config in agent_configs:
             try:
-                # Check if agent exists
-                existing = self.ai_client.agents.list_agents()
-                agent = None
-                for existing_agent in existing:
-                    if existing_agent.name == config['name']:
-                        agent = existing_agent
-                        break
-
-                if not agent:
-                    agent = self.ai_client.agents.create_agent(
-                        model=config['model'],
-                        name=config['name'],
-                        instructions=config['instructions']
-                    )
+                agent = created_agents.get(config['name'])
+                if isinstance(agent, Exception):
+                    raise agent
+                if agent:
                     print(f"✅ Created agent: {config['name']}")
                 else:
+                    agent = existing_agents[config['name']]
                     print(f"♻️  Reusing agent: {config['name']}")
 
                 self.foundry_agents[config['name']] = agent
@@ -297,24 +440,24 @@ class SemanticKernelOrchestrator:
         span.set_attribute("orchestration.type", "sequential")
         span.set_attribute("topic", topic)
 
-        print("\n🔄 Sequential Multi-Agent Orchestration")
-        print("=" * 60)
+        demo_print("sequential", "\n🔄 Sequential Multi-Agent Orchestration")
+        demo_print("sequential", "=" * 60)
 
-        initial_message = f"""
-        Create a comprehensive report on: {topic}
-        Focus area: {focus_area if focus_area else 'General overview'}
-        Please coordinate the following:
-        1. Research the topic thoroughly
-        2. Analyze the findings for insights
-        3. Create a professional document with recommendations
-        """
+        initial_message = SEQUENTIAL_TASK_TEMPLATE.format(
+            topic=topic,
+            focus_area=focus_area if focus_area else 'General overview'
+        )
 
-        print(f"📋 Task: {topic}")
-        print("🚀 Starting sequential orchestration...\n")
+        demo_print("sequential", f"📋 Task: {topic}")
+        demo_print("sequential", "🚀 Starting sequential orchestration...\n")
 
         results = []
         current_message = initial_message
 
+        # All phases run on one thread, so each agent continues the same conversation
+        thread = await asyncio.to_thread(self.ai_client.agents.threads.create)
+        span.set_attribute(ATTR_THREAD_ID, thread.id)
+
         agents_sequence = [
             ('research-specialist', 'Research Phase'),
             ('analysis-specialist', 'Analysis Phase'),
@@ -322,20 +465,22 @@ class SemanticKernelOrchestrator:
         ]
 
         for agent_name, phase in agents_sequence:
-            print(f"\n📌 {phase}: {agent_name}")
+            demo_print("sequential", f"\n📌 {phase}: {agent_name}")
             agent = self.sk_agents[agent_name]
+            t_ns = time.monotonic_ns()
 
-            messages = [ChatMessageContent(role=AuthorRole.USER, content=current_message)]
-
-            async for response in agent.invoke(messages):
-                print(f"💬 {agent.name}: {response.content[:200]}...")
-                results.append({
-                    "agent": agent.name,
-                    "phase": phase,
-                    "content": response.content,
-                    "timestamp": datetime.now().isoformat()
-                })
-                current_message = f"Based on the previous work: {response.content}\n\nPlease continue with your specialized task."
+            try:
+                response = await agent.invoke_one(current_message, thread_id=thread.id)
+            except AgentRunError as e:
+                # Later phases build on this one, so there is nothing left to continue
+                demo_print("sequential", f"❌ {agent.name} failed, stopping the pipeline: {e}")
+                break
+            content = response.content
+            demo_print("sequential", f"💬 {agent.name}: {content[:200]}...")
+            results.append(Turn(agent.name, phase, content, t_ns))
+            # The previous phase's reply is already on the shared thread, so
+            # the next phase is only told to continue rather than sent it again
+            current_message = SEQUENTIAL_CONTINUE_MESSAGE
 
         return results
 
@@ -346,30 +491,56 @@ class SemanticKernelOrchestrator:
         span.set_attribute("orchestration.type", "roundrobin")
         span.set_attribute("topic", topic)
 
-        print("\n🔁 Round-Robin Multi-Agent Discussion")
-        print("=" * 60)
-        print(f"💭 Discussion topic: {topic}")
-        print("🔄 Starting round-robin discussion...\n")
+        demo_print("round-robin", "\n🔁 Round-Robin Multi-Agent Discussion")
+        demo_print("round-robin", "=" * 60)
+        demo_print("round-robin", f"💭 Discussion topic: {topic}")
+        demo_print("round-robin", "🔄 Starting round-robin discussion...\n")
 
         discussion = []
-        messages_history = [ChatMessageContent(role=AuthorRole.USER, content=f"Let's discuss: {topic}")]
+        agents = [self.sk_agents[name] for name in SPECIALIST_INSTRUCTIONS if name in self.sk_agents]
+
+        # One Foundry thread per agent for this discussion: the service keeps each
+        # agent's side of the conversation, so later rounds only send what the
+        # others said last round. Threads are per session, not per agent, because
+        # the other demos may be running the same agents concurrently
+        threads = await asyncio.gather(*(
+            asyncio.to_thread(self.ai_client.agents.threads.create) for _ in agents
+        ))
+        round_replies: Dict[str, str] = {}
 
         num_rounds = 2  # Reduced for faster demo
 
         for round_num in range(num_rounds):
-            print(f"\n--- Round {round_num + 1} ---")
-            for agent_name in self.sk_agents.keys():
-                agent = self.sk_agents[agent_name]
-
-                async for response in agent.invoke(messages_history):
-                    print(f"💬 {agent.name}: {response.content[:150]}...")
-                    discussion.append({
-                        "round": round_num + 1,
-                        "agent": agent.name,
-                        "content": response.content,
-                        "timestamp": datetime.now().isoformat()
-                    })
-                    messages_history.append(response)
+            demo_print("round-robin", f"\n--- Round {round_num + 1} ---")
+            # Every agent in a round answers the replies from the previous round,
+            # so the turns run concurrently and are recorded in agent order
+            phase = f"Round {round_num + 1}"
+            t_ns = time.monotonic_ns()
+            prompts = [
+                DISCUSSION_FOLLOWUP_TEMPLATE.format(replies="\n\n".join(
+                    f"{name}: {reply}" for name, reply in round_replies.items() if name != agent.name
+                )) if round_num else DISCUSSION_TEMPLATE.format(topic=topic)
+                for agent in agents
+            ]
+            responses = await asyncio.gather(
+                *(
+                    agent.invoke_one(prompt, thread_id=thread.id)
+                    for agent, thread, prompt in zip(agents, threads, prompts)
+                ),
+                return_exceptions=True
+            )
+
+            round_replies = {}
+            for agent, response in zip(agents, responses):
+                # A failed agent sits out this round instead of aborting the discussion,
+                # and its error is neither recorded nor passed on to the others
+                if isinstance(response, Exception):
+                    demo_print("round-robin", f"❌ {agent.name} failed this round: {response}")
+                    continue
+                content = response.content
+                demo_print("round-robin", f"💬 {agent.name}: {content[:150]}...")
+                discussion.append(Turn(agent.name, phase, content, t_ns))
+                round_replies[agent.name] = content
 
         return discussion
 
@@ -380,33 +551,51 @@ class SemanticKernelOrchestrator:
         span.set_attribute("orchestration.type", "hybrid")
         span.set_attribute("goal", goal)
 
-        print("\n🔀 Hybrid Orchestration")
-        print("=" * 60)
+        demo_print("hybrid", "\n🔀 Hybrid Orchestration")
+        demo_print("hybrid", "=" * 60)
         results = {}
 
         # Phase 1: Research
-        print("\n📌 Phase 1: Research Specialist")
+        demo_print("hybrid", "\n📌 Phase 1: Research Specialist")
         research_result = await self.sk_agents['research-specialist'].get_response(
-            f"Research this topic: {goal}"
+            RESEARCH_TEMPLATE.format(goal=goal)
         )
         results['research'] = research_result
-        print(f"Research: {research_result[:200]}...")
+        demo_print("hybrid", f"Research: {research_result[:200]}...")
+
+        if FUSE_STAGES and COMBINED_AGENT_NAME in self.sk_agents:
+            # Phases 2+3 in one call: the combined agent returns both documents as JSON
+            demo_print("hybrid", "\n📌 Phase 2+3: Combined Analyst & Writer")
+            combined_result = await self.sk_agents[COMBINED_AGENT_NAME].get_response(
+                COMBINED_TEMPLATE.format(findings=research_result)
+            )
+            try:
+                parsed = parse_json_reply(combined_result)
+                results['analysis'] = str(parsed['analysis'])
+                results['final_document'] = str(parsed['briefing'])
+            except (ValueError, KeyError, TypeError):
+                # Not the requested JSON; keep the whole reply as the document
+                results['analysis'] = combined_result
+                results['final_document'] = combined_result
+            demo_print("hybrid", f"Analysis: {results['analysis'][:200]}...")
+            demo_print("hybrid", f"Document: {results['final_document'][:200]}...")
+            return results
 
         # Phase 2: Analysis
-        print("\n📌 Phase 2: Analysis Specialist")
+        demo_print("hybrid", "\n📌 Phase 2: Analysis Specialist")
         analysis_result = await self.sk_agents['analysis-specialist'].get_response(
-            f"Analyze these findings: {research_result}"
+            ANALYSIS_TEMPLATE.format(findings=research_result)
         )
         results['analysis'] = analysis_result
-        print(f"Analysis: {analysis_result[:200]}...")
+        demo_print("hybrid", f"Analysis: {analysis_result[:200]}...")
 
         # Phase 3: Writing
-        print("\n📌 Phase 3: Writing Specialist")
+        demo_print("hybrid", "\n📌 Phase 3: Writing Specialist")
         writing_result = await self.sk_agents['writing-specialist'].get_response(
-            f"Create executive briefing from: {analysis_result}"
+            BRIEFING_TEMPLATE.format(analysis=analysis_result)
         )
         results['final_document'] = writing_result
-        print(f"Document: {writing_result[:200]}...")
+        demo_print("hybrid", f"Document: {writing_result[:200]}...")
 
         return results
 
@@ -425,23 +614,22 @@ class SemanticKernelOrchestrator:
 
         results = {}
 
-        # Demo 1: Sequential
-        sequential_results = await self.demonstrate_sequential_orchestration(
-            topic="AI in Healthcare",
-            focus_area="Diagnostic imaging"
+        # The three demos share no threads or state, so they run concurrently:
+        # sequential, round-robin and hybrid
+        sequential_results, roundrobin_results, hybrid_results = await asyncio.gather(
+            self.demonstrate_sequential_orchestration(
+                topic="AI in Healthcare",
+                focus_area="Diagnostic imaging"
+            ),
+            self.demonstrate_roundrobin_orchestration(
+                topic="Quantum Computing impact"
+            ),
+            self.demonstrate_hybrid_orchestration(
+                goal="Sustainable energy future"
+            )
         )
         results['sequential'] = sequential_results
-
-        # Demo 2: Round-robin
-        roundrobin_results = await self.demonstrate_roundrobin_orchestration(
-            topic="Quantum Computing impact"
-        )
         results['roundrobin'] = roundrobin_results
-
-        # Demo 3: Hybrid
-        hybrid_results = await self.demonstrate_hybrid_orchestration(
-            goal="Sustainable energy future"
-        )
         results['hybrid'] = hybrid_results
 
         # Summary
@@ -472,8 +660,14 @@ async def main():
         output_dir = Path("output")
         output_dir.mkdir(exist_ok=True)
 
-        with open(output_dir / "sk_orchestration.json", "w") as f:
-            json.dump(results, f, indent=2, default=str)
+        try:
+            # orjson serializes the Turn dataclasses natively, straight to UTF-8 bytes
+            import orjson
+            with open(output_dir / "sk_orchestration.json", "wb") as f:
+                f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+        except ImportError:
+            with open(output_dir / "sk_orchestration.json", "w") as f:
+                json.dump(results, f, indent=2, default=lambda o: asdict(o) if is_dataclass(o) else str(o))
         print(f"\n📁 Results saved to {output_dir}/sk_orchestration.json")
 
         return results
@@ -485,4 +679,9 @@ async def main():
 if __name__ == "__main__":
     print("🚀 Starting Semantic Kernel Agent Orchestration")
     print("-" * 70)
-    asyncio.run(main())
+    try:
+        # uvloop's event loop cuts the per-await overhead of the gather-heavy demos
+        from uvloop import run as run_event_loop
+    except ImportError:
+        run_event_loop = asyncio.run
+    run_event_loop(main())
@@ -27,7 +27,8 @@ from semantic_kernel.data.vector import (
 )
 
 from azure.ai.projects import AIProjectClient, enable_telemetry
-from azure.identity import DefaultAzureCredential
+from azure.ai.agents.models import ListSortOrder
+from clients import get_credential
 from azure.core.exceptions import ResourceNotFoundError
 from azure.search.documents.indexes.aio import SearchIndexClient
 from azure.search.documents.indexes.models import SearchIndex, SearchField, SearchFieldDataType, VectorSearch, VectorSearchProfile, HnswAlgorithmConfiguration
@@ -64,7 +65,7 @@ try:
         _proj_ep = os.getenv("AZURE_AI_PROJECT_ENDPOINT") or os.getenv("PROJECT_ENDPOINT")
         if _proj_ep:
             try:
-                _tmp = AIProjectClient(endpoint=_proj_ep, credential=DefaultAzureCredential())
+                _tmp = AIProjectClient(endpoint=_proj_ep, credential=get_credential())
                 _conn = _tmp.telemetry.get_application_insights_connection_string()
             except Exception as e:
                 print(f"⚠️ Unable to fetch Application Insights connection from project endpoint: {e}")
@@ -120,7 +121,7 @@ class MultiAgentOrchestrator:
         self._setup_semantic_kernel()
         
         # Initialize Azure AI Foundry client
-        self.credential = DefaultAzureCredential()
+        self.credential = get_credential()
         self.ai_client = AIProjectClient(
             endpoint=os.getenv('PROJECT_ENDPOINT'),
             credential=self.credential
@@ -531,35 +532,50 @@ class MultiAgentOrchestrator:
             enhanced_request = request
         
         try:
+            # The agents client is synchronous; run its calls in worker threads
+            # so they don't stall the event loop (and the memory/search I/O)
+            agents_client = self.ai_client.agents
+            
             # Create thread and run conversation
-            thread = self.ai_client.agents.threads.create()
-            self.ai_client.agents.messages.create(
+            thread = await asyncio.to_thread(agents_client.threads.create)
+            await asyncio.to_thread(
+                agents_client.messages.create,
                 thread_id=thread.id,
                 role="user",
                 content=enhanced_request
             )
             
-            run = self.ai_client.agents.runs.create(
+            run = await asyncio.to_thread(
+                agents_client.runs.create,
                 thread_id=thread.id,
                 agent_id=agent.id
             )
             
-            # Wait for completion
-            import time
-            while run.status in ["queued", "in_progress"]:
-                time.sleep(1)
-                run = self.ai_client.agents.runs.get(thread_id=thread.id, run_id=run.id)
+            # Wait for completion, polling quickly at first and backing off
+            # (0.1s, 0.2s, 0.4s, ... capped at 2s) for longer runs
+            delay = 0.1
+            while run.status in {"queued", "in_progress"}:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 2.0)
+                run = await asyncio.to_thread(agents_client.runs.get, thread_id=thread.id, run_id=run.id)
             
             if run.status == "completed":
-                messages = self.ai_client.agents.messages.list(thread_id=thread.id)
-                for msg in messages:
-                    if msg.role == "assistant":
-                        response = self._extract_message_content(msg)
-                        
-                        # Save to memory
-                        await self._save_to_memory(agent_name, request, response, memory_enhanced_context)
-                        
-                        return response
+                # Ask for this run's newest message only instead of listing the thread
+                msg = await asyncio.to_thread(
+                    lambda: next(iter(agents_client.messages.list(
+                        thread_id=thread.id,
+                        run_id=run.id,
+                        order=ListSortOrder.DESCENDING,
+                        limit=1
+                    )), None)
+                )
+                if msg is not None and msg.role == "assistant":
+                    response = self._extract_message_content(msg)
+                    
+                    # Save to memory
+                    await self._save_to_memory(agent_name, request, response, memory_enhanced_context)
+                    
+                    return response
             
             return f"Error: Run ended with status {run.status}"
             
@@ -567,17 +583,8 @@ class MultiAgentOrchestrator:
             return f"Error executing agent {agent_name}: {str(e)}"
     
     def _extract_message_content(self, msg) -> str:
-        """Extract content from Azure AI message object"""
-        if hasattr(msg, 'content') and msg.content:
-            if isinstance(msg.content, list) and len(msg.content) > 0:
-                content_item = msg.content[0]
-                if hasattr(content_item, 'text'):
-                    if hasattr(content_item.text, 'value'):
-                        return content_item.text.value
-                    return str(content_item.text)
-                return str(content_item)
-            return str(msg.content)
-        return ""
+        """Extract the text of an Azure AI message; messages.list returns typed ThreadMessage objects"""
+        return "\n".join(block.text.value for block in msg.text_messages)
     
     @_tracer.start_as_current_span("agents.execute_collaborative")
     async def _execute_collaborative_workflow(self, agent_names: List[str], request: str, context: Optional[Dict]) -> str:
@@ -824,11 +831,17 @@ async def demonstrate_semantic_kernel_orchestration():
         
         # Save results
         from pathlib import Path
-        import json
         output_dir = Path("output")
         output_dir.mkdir(exist_ok=True)
-        with open(output_dir / "advanced_orchestration_results.json", "w") as f:
-            json.dump(workflow_results, f, indent=2)
+        try:
+            # orjson serializes straight to UTF-8 bytes in C
+            import orjson
+            with open(output_dir / "advanced_orchestration_results.json", "wb") as f:
+                f.write(orjson.dumps(workflow_results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        except ImportError:
+            import json
+            with open(output_dir / "advanced_orchestration_results.json", "w") as f:
+                json.dump(workflow_results, f, indent=2)
         
         print(f"📄 Results saved to {output_dir}/advanced_orchestration_results.json")
         
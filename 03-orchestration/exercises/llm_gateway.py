@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Process-wide gate for agent runs in the orchestration exercises
+
+Every run goes through one LLMGateway, which caps the number of runs in flight
+(MAX_IN_FLIGHT, default 10) and spaces run starts to stay under a requests per
+minute budget (RPM, default 500). When the service throttles with a 429 the
+gateway pauses all callers for the Retry-After period and tries again, instead
+of letting every concurrent caller retry on its own.
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from azure.core.exceptions import HttpResponseError
+
+
+def _retry_after_seconds(error, default):
+    """Seconds to wait from a throttled response's Retry-After header, or the default"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for header in ("retry-after-ms", "x-ms-retry-after-ms"):
+        if headers.get(header):
+            try:
+                return float(headers[header]) / 1000
+            except ValueError:
+                pass
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return default
+
+
+class LLMGateway:
+    """Bounds concurrent agent runs and their start rate for the whole process
+
+    Thread-safe, so it serves both the synchronous call sites and the async
+    ones, which run the SDK calls on worker threads with asyncio.to_thread.
+    """
+
+    def __init__(self, max_in_flight=10, rpm=500, max_retries=3):
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._interval = 60.0 / rpm
+        self._max_retries = max_retries
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def _wait_for_turn(self):
+        # Reserve the next start time under the lock, then sleep outside it
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self._interval
+        if start > now:
+            time.sleep(start - now)
+
+    def back_off(self, seconds):
+        """Hold back every caller's next start for the given number of seconds"""
+        with self._lock:
+            self._next_start = max(self._next_start, time.monotonic() + seconds)
+
+    @contextmanager
+    def slot(self):
+        """Hold one in-flight slot, entered no sooner than the rate limit allows"""
+        with self._slots:
+            self._wait_for_turn()
+            yield
+
+    def call(self, func, *args, **kwargs):
+        """Call func inside a slot, retrying after Retry-After when throttled"""
+        for attempt in range(self._max_retries + 1):
+            with self.slot():
+                try:
+                    return func(*args, **kwargs)
+                except HttpResponseError as e:
+                    if e.status_code != 429 or attempt == self._max_retries:
+                        raise
+                    delay = _retry_after_seconds(e, default=2 ** attempt)
+            self.back_off(delay)
+
+
+@lru_cache(maxsize=1)
+def get_gateway():
+    """Return the process-wide gateway, configured from MAX_IN_FLIGHT and RPM"""
+    return LLMGateway(
+        max_in_flight=int(os.getenv("MAX_IN_FLIGHT", "10")),
+        rpm=int(os.getenv("RPM", "500"))
+    )
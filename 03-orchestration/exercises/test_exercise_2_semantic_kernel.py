@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Round-robin orchestration with stand-in agents, so no Azure resources are needed"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("semantic_kernel")
+pytest.importorskip("azure.ai.projects")
+
+from semantic_kernel.contents import ChatMessageContent, AuthorRole
+
+import exercise_2_semantic_kernel as ex
+
+
+class FakeAgent:
+    """Records the prompts it is sent; raises AgentRunError instead of replying when failing"""
+
+    def __init__(self, name: str, failing: bool = False):
+        self.name = name
+        self.failing = failing
+        self.prompts = []
+
+    async def invoke_one(self, user_text: str, thread_id=None) -> ChatMessageContent:
+        self.prompts.append(user_text)
+        if self.failing:
+            raise ex.AgentRunError("Run ended with status failed")
+        return ChatMessageContent(role=AuthorRole.ASSISTANT, content=f"{self.name} reply", name=self.name)
+
+
+def make_orchestrator(agents):
+    orchestrator = ex.SemanticKernelOrchestrator.__new__(ex.SemanticKernelOrchestrator)
+    orchestrator.sk_agents = {agent.name: agent for agent in agents}
+    threads = SimpleNamespace(create=lambda: SimpleNamespace(id="thread"))
+    orchestrator.ai_client = SimpleNamespace(agents=SimpleNamespace(threads=threads))
+    return orchestrator
+
+
+def test_roundrobin_leaves_out_failing_agent():
+    research = FakeAgent("research-specialist")
+    analysis = FakeAgent("analysis-specialist", failing=True)
+    writing = FakeAgent("writing-specialist")
+    orchestrator = make_orchestrator([research, analysis, writing])
+
+    discussion = asyncio.run(orchestrator.demonstrate_roundrobin_orchestration("topic"))
+
+    assert {turn.agent for turn in discussion} == {"research-specialist", "writing-specialist"}
+    assert len(discussion) == 4
+    assert not any("failed" in turn.content for turn in discussion)
+    # Round 2 prompts are built from round_replies, which must not include the failed agent
+    assert "writing-specialist reply" in research.prompts[1]
+    assert "analysis-specialist" not in research.prompts[1]
+    assert "analysis-specialist" not in writing.prompts[1]
@@ -14,13 +14,57 @@ Learning Objectives:
 """
 
 import asyncio
+import ast
 import json
 import logging
+import operator
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Union
 from dataclasses import dataclass
 from datetime import datetime
 import uuid
 
+# Limits on powers, so an expression like 9**9**9**9 is rejected instead of
+# computed; the expression comes from the model or a client
+MAX_EXPONENT = 1000
+MAX_POW_BITS = 4096
+
+def _safe_pow(base: Union[int, float], exponent: Union[int, float]) -> Union[int, float]:
+    """Raise base to exponent, refusing results too large to compute quickly"""
+    if abs(exponent) > MAX_EXPONENT:
+        raise ValueError(f"Exponent too large (limit {MAX_EXPONENT})")
+    if isinstance(base, int) and isinstance(exponent, int) and base.bit_length() * exponent > MAX_POW_BITS:
+        raise ValueError(f"Result too large (limit {MAX_POW_BITS} bits)")
+    return operator.pow(base, exponent)
+
+# Arithmetic operators the calculate tool is allowed to evaluate
+SAFE_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _safe_pow,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+def _evaluate_node(node: ast.AST) -> Union[int, float]:
+    """Evaluate a whitelisted arithmetic AST node"""
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in SAFE_OPERATORS:
+        return SAFE_OPERATORS[type(node.op)](_evaluate_node(node.left), _evaluate_node(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in SAFE_OPERATORS:
+        return SAFE_OPERATORS[type(node.op)](_evaluate_node(node.operand))
+    raise ValueError(f"Unsupported expression element: {type(node).__name__}")
+
+@lru_cache(maxsize=256)
+def evaluate_expression(expression: str) -> Union[int, float]:
+    """Parse and evaluate an arithmetic expression, caching by expression text"""
+    return _evaluate_node(ast.parse(expression.strip(), mode="eval").body)
+
 # MCP protocol message types
 @dataclass
 class MCPMessage:
@@ -212,8 +256,8 @@ class BasicMCPServer:
         """Execute calculate tool"""
         expression = arguments.get("expression", "")
         try:
-            # Simple evaluation - in production, use a safer approach
-            result = eval(expression)
+            # Only numbers and arithmetic operators are evaluated, never arbitrary code
+            result = evaluate_expression(expression)
             return f"Result: {result}"
         except Exception as e:
             return f"Error: {str(e)}"
@@ -349,6 +393,13 @@ class MCPServerTest:
         response = await self.server.handle_request(request)
         print(f"✓ Calculate tool: {response['result']['content'][0]['text']}")
         
+        # The calculate tool must refuse anything but plain arithmetic on numbers,
+        # and powers too large to compute
+        for expression in ("__import__('os').getcwd()", "True + 1", "9**9**9**9", "2**100000"):
+            result = await self.server._execute_calculate({"expression": expression})
+            assert result.startswith("Error:"), f"{expression!r} was not rejected: {result}"
+            print(f"✓ Calculate rejected {expression!r}: {result}")
+        
         # Test current_time tool
         request = {
             "jsonrpc": "2.0",
@@ -9,9 +9,12 @@ import time
 import json
 import os
 import requests
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 from azure.ai.projects import AIProjectClient
+from azure.ai.agents.models import ListSortOrder
 from azure.identity import DefaultAzureCredential
 
 # Load environment variables
@@ -20,6 +23,16 @@ load_dotenv()
 # MCP Server configuration
 MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://localhost:3000")
 
+@lru_cache(maxsize=None)
+def get_credential():
+    """Return one DefaultAzureCredential per process so its token cache is reused across runs"""
+    return DefaultAzureCredential(
+        exclude_interactive_browser_credential=True,
+        exclude_visual_studio_code_credential=True,
+        exclude_shared_token_cache_credential=True,
+        process_timeout=10
+    )
+
 def check_mcp_url():
     """Check if MCP server URL is publicly accessible"""
     if "localhost" in MCP_SERVER_URL or "127.0.0.1" in MCP_SERVER_URL:
@@ -55,10 +68,13 @@ def create_mcp_agent_with_sqlite():
     # Create AI Project Client
     project_client = AIProjectClient(
         endpoint=os.getenv('PROJECT_ENDPOINT'),
-        credential=DefaultAzureCredential()
+        credential=get_credential()
     )
 
-    with project_client:
+    with project_client, ThreadPoolExecutor(max_workers=1) as pool:
+        # The thread doesn't depend on the agent, so create it while the agent is being created
+        thread_future = pool.submit(project_client.agents.threads.create)
+        
         try:
             # Create agent with native MCP tool configuration
             agent = project_client.agents.create_agent(
@@ -105,8 +121,7 @@ def create_mcp_agent_with_sqlite():
                 print("   Current deployment name:", os.getenv('MODEL_DEPLOYMENT_NAME'))
             raise
 
-        # Create a thread
-        thread = project_client.agents.threads.create()
+        thread = thread_future.result()
         print(f"📞 Created thread: {thread.id}")
 
         # Real business analytics scenarios using actual database
@@ -138,7 +153,7 @@ def create_mcp_agent_with_sqlite():
             print("=" * 60)
             
             # Send analytics request
-            message = project_client.agents.messages.create(
+            project_client.agents.messages.create(
                 thread_id=thread.id, 
                 role="user", 
                 content=scenario['query'],
@@ -217,18 +232,18 @@ def create_mcp_agent_with_sqlite():
                 print(f"   Error type: {type(e).__name__}")
                 continue
 
-            # Get the response
-            messages = project_client.agents.messages.list(thread_id=thread.id)
+            # Get the response: only this run's newest message, not the whole thread
+            msg = next(iter(project_client.agents.messages.list(
+                thread_id=thread.id,
+                run_id=run.id,
+                order=ListSortOrder.DESCENDING,
+                limit=1
+            )), None)
             
-            # Find and display the assistant's analysis
-            for msg in messages:
-                if msg.role == "assistant" and msg.created_at > message.created_at:
-                    for content in msg.content:
-                        if hasattr(content, 'text') and hasattr(content.text, 'value'):
-                            print(f"\n💡 Analysis Results:")
-                            print(content.text.value)
-                            break
-                    break
+            # Display the assistant's analysis
+            if msg is not None and msg.role == "assistant" and msg.text_messages:
+                print(f"\n💡 Analysis Results:")
+                print("\n".join(block.text.value for block in msg.text_messages))
             
             print("\n" + "-" * 60)
 